@@ -0,0 +1,35 @@
+"""토큰 캐시 유무/JWT 백엔드별 요청당 인증 오버헤드
+
+$ ENV_STATE=test python -m benchmarks.bench_auth
+"""
+
+import timeit
+
+from socialapi import security
+from socialapi.config import config
+
+NUMBER = 20_000
+
+
+def bench(name: str, clear_cache: bool) -> None:
+    token = security.create_access_token("test@test.com")
+
+    def verify():
+        if clear_cache:
+            security.token_cache.clear()
+        security.get_subject_for_token_type(token, "access")
+
+    verify()
+    seconds = min(timeit.repeat(verify, number=NUMBER, repeat=3))
+    print(f"{name:<24} {seconds / NUMBER * 1_000_000:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    for backend in ("jose", "pyjwt"):
+        config.JWT_BACKEND = backend
+        try:
+            bench(f"{backend} (no cache)", clear_cache=True)
+        except ImportError:
+            print(f"{backend:<24} not installed")
+            continue
+        bench(f"{backend} (cached)", clear_cache=False)
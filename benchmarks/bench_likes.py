@@ -0,0 +1,102 @@
+"""좋아요 부하 테스트: 클릭마다 INSERT + UPDATE vs like_buffer로 모아서 쓰기
+
+동시에 CONCURRENCY개씩, 사용자 USERS명이 인기 게시글 POSTS개에 전부 좋아요
+
+$ python -m benchmarks.bench_likes
+# postgres로
+$ TEST_DATABASE_URL=postgresql://... python -m benchmarks.bench_likes
+"""
+
+import asyncio
+import os
+import time
+
+import sqlalchemy
+from httpx import ASGITransport, AsyncClient
+
+# 요청마다 트랜잭션을 열어야 해서 force_rollback(커넥션 하나를 공유) 없이 별도 DB로
+os.environ["ENV_STATE"] = "test"
+os.environ["TEST_DB_FORCE_ROLL_BACK"] = "false"
+os.environ.setdefault("TEST_DATABASE_URL", "sqlite:///bench_likes.db")
+
+from socialapi.config import config  # noqa: E402
+from socialapi.database import (  # noqa: E402
+    database,
+    engine,
+    metadata,
+    post_table,
+    user_table,
+)
+from socialapi.like_buffer import like_buffer  # noqa: E402
+from socialapi.main import app  # noqa: E402
+from socialapi.security import create_access_token  # noqa: E402
+
+USERS = 200
+POSTS = 5
+# sqlite는 쓰기 트랜잭션이 동시에 하나뿐이라 (동시에 열면 database is locked)
+CONCURRENCY = 1 if "sqlite" in config.DATABASE_URL else 20
+
+
+async def create_users(prefix: str) -> list[str]:
+    emails = [f"{prefix}{i}@bench.com" for i in range(USERS)]
+    await database.execute_many(
+        user_table.insert(),
+        [{"email": email, "password": "x", "confirmed": True} for email in emails],
+    )
+
+    return [create_access_token(email) for email in emails]
+
+
+async def create_posts() -> list[int]:
+    return [
+        await database.execute(post_table.insert().values(body="Viral", user_id=1))
+        for _ in range(POSTS)
+    ]
+
+
+async def bench(name: str, buffered: bool) -> None:
+    like_buffer.enabled = buffered
+    tokens = await create_users(name)
+    post_ids = await create_posts()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+
+        async def like(token: str, post_id: int) -> None:
+            async with semaphore:
+                response = await client.post(
+                    "/posts/like",
+                    json={"post_id": post_id},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(like(token, post_id) for token in tokens for post_id in post_ids)
+        )
+        await like_buffer.flush()
+        elapsed = time.perf_counter() - started
+
+    query = sqlalchemy.select(sqlalchemy.func.sum(post_table.c.like_count)).where(
+        post_table.c.id.in_(post_ids)
+    )
+    assert await database.fetch_val(query) == USERS * POSTS
+
+    print(f"{name:<10} {USERS * POSTS / elapsed:10,.0f} likes/s")
+
+
+async def main() -> None:
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    await database.connect()
+    await bench("direct", buffered=False)
+    await bench("buffered", buffered=True)
+    await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
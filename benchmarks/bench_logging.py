@@ -0,0 +1,56 @@
+"""핸들러가 직접 포맷팅/파일 쓰기를 할 때와 QueueHandler로 넘길 때, 호출하는 쪽의 지연
+
+$ ENV_STATE=test python -m benchmarks.bench_logging
+"""
+
+import logging
+import statistics
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from pythonjsonlogger.jsonlogger import JsonFormatter
+
+from socialapi.logging_conf import start_queue_listener
+
+NUMBER = 20_000
+
+
+def make_logger(name: str, directory: str) -> logging.Logger:
+    handler = RotatingFileHandler(
+        f"{directory}/{name}.log", maxBytes=1024 * 1024, backupCount=5
+    )
+    handler.setFormatter(
+        JsonFormatter("%(asctime)s %(levelname)s %(name)s:%(lineno)d - %(message)s")
+    )
+
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+
+    return logger
+
+
+def bench(name: str, logger: logging.Logger) -> None:
+    latencies = []
+    for i in range(NUMBER):
+        started = time.perf_counter()
+        logger.info("Getting all posts", extra={"post_id": i})
+        latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+    print(
+        f"{name:<8} mean {statistics.mean(latencies) * 1_000_000:6.2f} us"
+        f"  p99 {latencies[int(NUMBER * 0.99)] * 1_000_000:7.2f} us"
+    )
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        bench("direct", make_logger("direct", directory))
+
+        queued = make_logger("queued", directory)
+        listener = start_queue_listener([queued])
+        bench("queued", queued)
+        listener.stop()
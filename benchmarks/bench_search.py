@@ -0,0 +1,122 @@
+"""게시글 검색: LIKE '%q%' (전체 스캔) vs 전문 검색 인덱스 (FTS5 / GIN)
+
+ROWS개 게시글을 한 번 넣어 두고 (bench_search.db) 같은 검색어로 지연 시간 비교.
+흔한 단어는 LIKE가 최신 글부터 LIMIT개만 찾고 멈추지만, 검색은 관련도 순이라
+맞는 글을 전부 점수 매겨야 해서 더 느림 (드문 단어에서 차이가 큼)
+
+$ python -m benchmarks.bench_search
+# postgres로
+$ TEST_DATABASE_URL=postgresql://... python -m benchmarks.bench_search
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import time
+
+import sqlalchemy
+
+# 시드가 커서 force_rollback 없이 별도 DB에 남겨 두고 재사용
+os.environ["ENV_STATE"] = "test"
+os.environ["TEST_DB_FORCE_ROLL_BACK"] = "false"
+os.environ.setdefault("TEST_DATABASE_URL", "sqlite:///bench_search.db")
+
+from socialapi.database import (  # noqa: E402
+    database,
+    engine,
+    metadata,
+    post_table,
+    user_table,
+)
+from socialapi.routers.post import select_post_and_likes  # noqa: E402
+from socialapi.search import search_scores  # noqa: E402
+
+ROWS = int(os.environ.get("BENCH_ROWS", 1_000_000))
+BATCH = 10_000
+NUMBER = 20
+LIMIT = 20
+
+WORDS = [f"word{i}" for i in range(5_000)]
+# 드문 단어(결과 수십 개)와 흔한 단어(결과 수천 개)
+QUERIES = ["needle", "common"]
+
+
+def body(i: int) -> str:
+    words = random.sample(WORDS, 8)
+    if i % 50_000 == 0:
+        words.append("needle")
+    if i % 100 == 0:
+        words.append("common")
+    return " ".join(words)
+
+
+def seeded() -> bool:
+    if not sqlalchemy.inspect(engine).has_table("posts"):
+        return False
+
+    with engine.connect() as connection:
+        count = sqlalchemy.select(sqlalchemy.func.count(post_table.c.id))
+        return connection.scalar(count) == ROWS
+
+
+def seed() -> None:
+    if seeded():
+        return
+
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    random.seed(0)
+    with engine.begin() as connection:
+        connection.execute(user_table.insert().values(email="bench", password="x"))
+        for start in range(0, ROWS, BATCH):
+            connection.execute(
+                post_table.insert(),
+                [{"body": body(i), "user_id": 1} for i in range(start, start + BATCH)],
+            )
+        if engine.dialect.name == "postgresql":
+            connection.execute(sqlalchemy.text("ANALYZE posts"))
+
+
+def like_query(q: str) -> sqlalchemy.Select:
+    return (
+        select_post_and_likes.where(post_table.c.body.like(f"%{q}%"))
+        .order_by(post_table.c.id.desc())
+        .limit(LIMIT)
+    )
+
+
+def search_query(q: str) -> sqlalchemy.Select:
+    scores = search_scores(q)
+    return (
+        select_post_and_likes.join(scores, scores.c.post_id == post_table.c.id)
+        .order_by(scores.c.score.desc(), post_table.c.id.desc())
+        .limit(LIMIT)
+    )
+
+
+async def bench(name: str, build, q: str) -> None:
+    timings = []
+    for _ in range(NUMBER):
+        started = time.perf_counter()
+        await database.fetch_all(build(q))
+        timings.append(time.perf_counter() - started)
+
+    print(
+        f"{name:<8} {q:<8} median {statistics.median(timings) * 1000:8.2f} ms"
+        f"  max {max(timings) * 1000:8.2f} ms"
+    )
+
+
+async def main() -> None:
+    seed()
+
+    await database.connect()
+    for q in QUERIES:
+        await bench("like", like_query, q)
+        await bench("search", search_query, q)
+    await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+"""피드 직렬화: 행마다 pydantic 검증 + JSON 인코딩 vs 행에서 바로 orjson
+
+$ ENV_STATE=test python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+from socialapi.database import database, engine, metadata, post_table, user_table
+from socialapi.models.post import UserPostPage
+from socialapi.response_cache import validated
+from socialapi.routers.post import select_post_and_likes, serialize_posts_page
+
+ROWS = 5_000
+NUMBER = 20
+
+
+async def fetch_rows() -> list:
+    await database.connect()
+    # test 설정은 force_rollback이라 disconnect하면 사라짐
+    await database.execute(user_table.insert().values(email="bench", password="x"))
+    await database.execute_many(
+        post_table.insert(),
+        [{"body": f"Post {i}", "user_id": 1, "like_count": i} for i in range(ROWS)],
+    )
+    rows = await database.fetch_all(select_post_and_likes)
+    await database.disconnect()
+
+    return rows
+
+
+def fastapi_default(page: dict) -> bytes:
+    # response_model=UserPostPage + JSONResponse로 돌려줄 때 하는 일
+    return json.dumps(jsonable_encoder(UserPostPage.model_validate(page))).encode()
+
+
+def bench(name: str, serialize, page: dict) -> None:
+    seconds = min(timeit.repeat(lambda: serialize(page), number=NUMBER, repeat=3))
+    print(f"{name:<10} {ROWS * NUMBER / seconds:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    metadata.create_all(engine)
+    page = {"posts": asyncio.run(fetch_rows()), "next_cursor": None}
+
+    bench("fastapi", fastapi_default, page)
+    bench("pydantic", validated(UserPostPage), page)
+    bench("orjson", serialize_posts_page, page)
@@ -0,0 +1,55 @@
+"""posts.like_count
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    # 상수 default가 있는 컬럼 추가는 postgres 11+에서 테이블을 다시 쓰지 않음
+    op.add_column(
+        "posts",
+        sa.Column("like_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    with op.get_context().autocommit_block():
+        # 한 번에 UPDATE하면 모든 행에 락이 오래 잡히니 id 구간별로 나눠서
+        connection = op.get_bind()
+        max_id = connection.scalar(sa.text("SELECT max(id) FROM posts")) or 0
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            connection.execute(
+                sa.text(
+                    "UPDATE posts SET like_count ="
+                    " (SELECT count(*) FROM likes WHERE likes.post_id = posts.id)"
+                    " WHERE id >= :start AND id < :end"
+                ),
+                {"start": start, "end": start + BATCH_SIZE},
+            )
+
+        op.create_index(
+            "ix_posts_like_count_id",
+            "posts",
+            ["like_count", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_like_count_id", table_name="posts", postgresql_concurrently=True
+        )
+
+    op.drop_column("posts", "like_count")
@@ -0,0 +1,71 @@
+"""secondary indexes and unique likes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, unique)
+indexes = [
+    ("ix_posts_user_id", "posts", ["user_id"], False),
+    ("ix_comments_post_id_id", "comments", ["post_id", "id"], False),
+    ("ix_comments_user_id", "comments", ["user_id"], False),
+    ("uq_likes_post_id_user_id", "likes", ["post_id", "user_id"], True),
+    ("ix_likes_user_id", "likes", ["user_id"], False),
+]
+
+
+def upgrade() -> None:
+    # unique index를 만들기 전에 중복 좋아요를 정리하고 카운터도 다시 맞추기
+    connection = op.get_bind()
+    duplicated_post_ids = connection.scalars(
+        sa.text(
+            "SELECT DISTINCT post_id FROM likes"
+            " GROUP BY post_id, user_id HAVING count(*) > 1"
+        )
+    ).all()
+    if duplicated_post_ids:
+        connection.execute(
+            sa.text(
+                "DELETE FROM likes WHERE id NOT IN"
+                " (SELECT min(id) FROM likes GROUP BY post_id, user_id)"
+            )
+        )
+        connection.execute(
+            sa.text(
+                "UPDATE posts SET like_count ="
+                " (SELECT count(*) FROM likes WHERE likes.post_id = posts.id)"
+                " WHERE id IN :post_ids"
+            ).bindparams(sa.bindparam("post_ids", expanding=True)),
+            {"post_ids": duplicated_post_ids},
+        )
+
+    # CONCURRENTLY는 트랜잭션 밖에서만 가능, 대신 쓰기를 막지 않음
+    # 실패하면 INVALID 인덱스가 남으니 지우고 다시 실행
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in indexes:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(indexes):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,65 @@
+"""full-text search on posts and comments
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+tables = ["posts", "comments"]
+
+
+def fts5_ddl(table: str) -> list[str]:
+    fts = f"{table}_fts"
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, body) VALUES ('delete', old.id, old.body);"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, body) VALUES (new.id, new.body);"
+
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(body, content='{table}',"
+        " content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF body ON {table}"
+        f" BEGIN {delete_old} {insert_new} END",
+        # 이미 있던 행을 색인
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        for table in tables:
+            for statement in fts5_ddl(table):
+                op.execute(statement)
+        return
+
+    # 인덱스를 만드는 동안에도 글/댓글을 쓸 수 있게 CONCURRENTLY
+    with op.get_context().autocommit_block():
+        for table in tables:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_body_search"
+                f" ON {table} USING gin (to_tsvector('english', coalesce(body, '')))"
+            )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        for table in reversed(tables):
+            # 트리거가 남아 있으면 이후 posts/comments에 쓸 때 없는 테이블을 찾음
+            for trigger in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        return
+
+    with op.get_context().autocommit_block():
+        for table in reversed(tables):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_body_search")
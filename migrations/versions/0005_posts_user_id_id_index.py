@@ -0,0 +1,50 @@
+"""index posts by (user_id, id) for user timelines
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (user_id, id)가 user_id만 있는 인덱스의 역할도 하므로 새로 만든 뒤 삭제
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_user_id_id",
+            "posts",
+            ["user_id", "id"],
+            postgresql_include=["like_count"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_posts_user_id",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_user_id",
+            "posts",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_posts_user_id_id",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
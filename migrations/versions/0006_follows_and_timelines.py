@@ -0,0 +1,64 @@
+"""follows, per-user timelines and users.follower_count
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 팔로우가 아직 없으니 0으로 시작 (ADD COLUMN이라 테이블을 다시 만들지 않음)
+    op.add_column(
+        "users",
+        sa.Column("follower_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    op.create_table(
+        "follows",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "follower_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False
+        ),
+        sa.Column(
+            "followee_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False
+        ),
+    )
+    op.create_index(
+        "uq_follows_follower_id_followee_id",
+        "follows",
+        ["follower_id", "followee_id"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_follows_followee_id_follower_id",
+        "follows",
+        ["followee_id", "follower_id"],
+    )
+
+    op.create_table(
+        "timelines",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id"), nullable=False),
+    )
+    op.create_index(
+        "uq_timelines_user_id_post_id",
+        "timelines",
+        ["user_id", "post_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("timelines")
+    op.drop_table("follows")
+    op.drop_column("users", "follower_count")
@@ -0,0 +1,45 @@
+"""posts.comment_count
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    # ADD COLUMN이라 posts를 다시 만들지 않음 (FTS 트리거가 유지됨)
+    # 상수 default라 postgres 11+에서도 테이블을 다시 쓰지 않고 락도 잠깐
+    op.add_column(
+        "posts",
+        sa.Column("comment_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # 0002와 같이 커밋한 뒤(ACCESS EXCLUSIVE 락을 놓은 뒤) id 구간별로 채우기
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        max_id = connection.scalar(sa.text("SELECT max(id) FROM posts")) or 0
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            connection.execute(
+                sa.text(
+                    "UPDATE posts SET comment_count ="
+                    " (SELECT count(*) FROM comments"
+                    " WHERE comments.post_id = posts.id)"
+                    " WHERE id >= :start AND id < :end"
+                ),
+                {"start": start, "end": start + BATCH_SIZE},
+            )
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "comment_count")
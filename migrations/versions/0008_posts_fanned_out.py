@@ -0,0 +1,46 @@
+"""posts.fanned_out for fan-out-on-read
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 상수 default라 테이블을 다시 쓰지 않음. 기존 글은 팔로우 전에 쓴 글이라 true
+    op.add_column(
+        "posts",
+        sa.Column("fanned_out", sa.Boolean(), server_default=sa.true(), nullable=False),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_posts_user_id_id_not_fanned_out",
+            "posts",
+            ["user_id", "id"],
+            sqlite_where=sa.text("NOT fanned_out"),
+            postgresql_where=sa.text("NOT fanned_out"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_posts_user_id_id_not_fanned_out",
+            table_name="posts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column("posts", "fanned_out")
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import logging
+
+import sqlalchemy
+
+from socialapi.database import comment_table, database, like_table, post_table
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_like_counts() -> int:
+    """posts.like_count를 likes 테이블 기준으로 다시 계산한다."""
+    logger.info("Reconciling post like counts")
+
+    return await reconcile_post_counts(post_table.c.like_count, like_table, "like")
+
+
+async def reconcile_comment_counts() -> int:
+    """posts.comment_count를 comments 테이블 기준으로 다시 계산한다."""
+    logger.info("Reconciling post comment counts")
+
+    return await reconcile_post_counts(
+        post_table.c.comment_count, comment_table, "comment"
+    )
+
+
+async def reconcile_post_counts(
+    counter: sqlalchemy.Column, table: sqlalchemy.Table, name: str
+) -> int:
+    actual_count = (
+        sqlalchemy.select(sqlalchemy.func.count(table.c.id))
+        .where(table.c.post_id == post_table.c.id)
+        .scalar_subquery()
+    )
+    mismatched = counter != actual_count
+    count_query = (
+        sqlalchemy.select(sqlalchemy.func.count())
+        .select_from(post_table)
+        .where(mismatched)
+    )
+    # 어긋난 행만 갱신
+    query = post_table.update().where(mismatched).values({counter: actual_count})
+
+    async with database.transaction():
+        fixed = await database.fetch_val(count_query, name=f"count_stale_{name}s")
+        await database.execute(query, name=f"reconcile_{name}_counts")
+
+    return fixed
+
+
+commands = {
+    "reconcile-likes": reconcile_like_counts,
+    "reconcile-comments": reconcile_comment_counts,
+}
+
+
+async def run(name: str) -> None:
+    await database.connect()
+    try:
+        result = await commands[name]()
+        logger.info(f"{name} finished, {result} rows fixed")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m socialapi.commands")
+    parser.add_argument("command", choices=commands)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.command))
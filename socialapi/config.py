@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,8 +13,57 @@ class BaseConfig(BaseSettings):
 class GlobalConfig(BaseConfig):
     DATABASE_URL: Optional[str] = None
     DB_FORCE_ROLL_BACK: bool = False
+    # 최대 커넥션이 5개인 경우에도 앱 이외의 커넥션을 생각해 줄이기 (postgres만 해당)
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 3
+    DB_CONNECT_TIMEOUT_SECONDS: float = 60.0
+    # pgbouncer(transaction 모드) 뒤에서는 0으로
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # 예: DATABASE_READ_URLS='["postgresql://replica1/db", "postgresql://replica2/db"]'
+    DATABASE_READ_URLS: list[str] = []
+    # 쓰기 직후 이 시간 동안은 replica 대신 primary에서 읽기 (복제 지연 대비)
+    READ_YOUR_WRITES_SECONDS: int = 5
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_MAX_SIZE: int = 10_000
+    LOG_QUEUE_DROP_POLICY: Literal["block", "drop_new", "drop_oldest"] = "drop_new"
+    # 운영에서도 켜두려면 예: SQL_LOG_LEVEL=DEBUG, SQL_LOG_SAMPLE_RATE=0.01
+    SQL_LOG_LEVEL: Optional[str] = None
+    SQL_LOG_SAMPLE_RATE: float = 1.0
     MAILGUN_DOMAIN: Optional[str] = None
     MAILGUN_API_KEY: Optional[str] = None
+    MAIL_QUEUE_MAX_SIZE: int = 1000
+    MAIL_WORKERS: int = 4
+    MAIL_MAX_RETRIES: int = 3
+    MAIL_RETRY_BACKOFF_SECONDS: float = 1.0
+    MAIL_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    MAIL_BATCH_WINDOW_SECONDS: float = 1.0
+    MAIL_BATCH_MAX_SIZE: int = 500
+    # bcrypt cost(2^n). 올리면 안전해지지만 로그인/가입이 느려짐
+    BCRYPT_ROUNDS: int = 12
+    # 해싱은 이벤트 루프 밖에서. bcrypt는 GIL을 놓아서 thread로도 충분
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    # 공개 GET /posts, /posts/{id} 응답 캐시. 쓰기가 있으면 바로 무효화되고
+    # 다른 워커에서 일어난 쓰기는 TTL이 지나야 반영됨
+    RESPONSE_CACHE_TTL_SECONDS: float = 10
+    RESPONSE_CACHE_MAX_SIZE: int = 1000
+    # /posts/bulk, /posts/comments/bulk, /posts/like/bulk 요청 하나에 담을 수 있는 최대 개수
+    BULK_MAX_BATCH_SIZE: int = 1000
+    # POST /posts/lookup 요청 하나로 가져올 수 있는 최대 게시글 수
+    POST_LOOKUP_MAX_IDS: int = 500
+    # 좋아요를 모아서 쓰기 (write-behind). 켜면 flush 전에 프로세스가 죽을 때 좋아요가 유실될 수 있음
+    LIKE_BUFFER_ENABLED: bool = False
+    LIKE_BUFFER_FLUSH_INTERVAL_SECONDS: float = 0.5
+    LIKE_BUFFER_MAX_SIZE: int = 1000
+    # 팔로워가 이보다 많으면 글을 쓸 때 타임라인에 뿌리지 않고 피드를 읽을 때 가져옴
+    FEED_FAN_OUT_MAX_FOLLOWERS: int = 10_000
+    # 팔로우하면 그 사용자의 최근 글을 이만큼 타임라인에 채워 넣기
+    FEED_BACKFILL_SIZE: int = 100
+    # "pyjwt"는 pip install pyjwt 필요
+    JWT_BACKEND: Literal["jose", "pyjwt"] = "jose"
 
 
 class DevConfig(GlobalConfig):
@@ -30,6 +79,8 @@ class TestConfig(GlobalConfig):
 
     DATABASE_URL: str = "sqlite:///test.db"
     DB_FORCE_ROLL_BACK: bool = True
+    BCRYPT_ROUNDS: int = 4
+    MAIL_RETRY_BACKOFF_SECONDS: float = 0.0
 
 
 @lru_cache
@@ -1,7 +1,18 @@
+import itertools
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Iterator
+
+import asyncpg
 import databases
 import sqlalchemy
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql import ClauseElement
 
 from socialapi.config import config
+from socialapi.metrics import DB_QUERY_DURATION
+from socialapi.query_logging import query_logger
 
 metadata = sqlalchemy.MetaData()
 
@@ -11,6 +22,46 @@ post_table = sqlalchemy.Table(
     sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
     sqlalchemy.Column("body", sqlalchemy.String),
     sqlalchemy.Column("user_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    # 읽을 때마다 likes를 COUNT하지 않도록 쓰기 시점에 갱신
+    sqlalchemy.Column(
+        "like_count",
+        sqlalchemy.Integer,
+        nullable=False,
+        server_default="0",
+    ),
+    # 목록에서 "댓글 N개"를 보여주려고 게시글마다 상세를 부르지 않도록
+    sqlalchemy.Column(
+        "comment_count",
+        sqlalchemy.Integer,
+        nullable=False,
+        server_default="0",
+    ),
+    # 팔로워 타임라인에 넣었는지. 넣지 않은 글(celebrity, fan-out 실패, 아직 처리 전)은
+    # 피드를 읽을 때 가져옴. create_post는 false로 넣고, 기존 글은 보낼 팔로워가 없었으니 true
+    sqlalchemy.Column(
+        "fanned_out",
+        sqlalchemy.Boolean,
+        nullable=False,
+        server_default=sqlalchemy.true(),
+    ),
+    # most_likes 정렬 + 커서 페이지네이션용
+    sqlalchemy.Index("ix_posts_like_count_id", "like_count", "id"),
+    # 사용자별 타임라인: user_id로 찾고 id 역순으로 바로 읽기 (정렬 없이 LIMIT만큼)
+    # postgres는 like_count까지 인덱스에 넣어 index-only로 (body는 길이 제한이 없어 btree에 넣지 않음)
+    sqlalchemy.Index(
+        "ix_posts_user_id_id",
+        "user_id",
+        "id",
+        postgresql_include=["like_count"],
+    ),
+    # 피드에서 읽을 때 가져올 글만 (대부분의 글은 fanned_out이라 인덱스가 작음)
+    sqlalchemy.Index(
+        "ix_posts_user_id_id_not_fanned_out",
+        "user_id",
+        "id",
+        sqlite_where=sqlalchemy.text("NOT fanned_out"),
+        postgresql_where=sqlalchemy.text("NOT fanned_out"),
+    ),
 )
 
 user_table = sqlalchemy.Table(
@@ -20,6 +71,13 @@ user_table = sqlalchemy.Table(
     sqlalchemy.Column("email", sqlalchemy.String, unique=True),
     sqlalchemy.Column("password", sqlalchemy.String),
     sqlalchemy.Column("confirmed", sqlalchemy.Boolean, default=False),
+    # 글을 쓸 때 팔로워 타임라인에 뿌릴지 정하려고 쓰기 시점에 갱신
+    sqlalchemy.Column(
+        "follower_count",
+        sqlalchemy.Integer,
+        nullable=False,
+        server_default="0",
+    ),
 )
 
 comment_table = sqlalchemy.Table(
@@ -29,6 +87,9 @@ comment_table = sqlalchemy.Table(
     sqlalchemy.Column("body", sqlalchemy.String),
     sqlalchemy.Column("post_id", sqlalchemy.ForeignKey("posts.id"), nullable=False),
     sqlalchemy.Column("user_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    # 게시글의 댓글을 id 순으로 읽으므로 (post_id, id)
+    sqlalchemy.Index("ix_comments_post_id_id", "post_id", "id"),
+    sqlalchemy.Index("ix_comments_user_id", "user_id"),
 )
 
 like_table = sqlalchemy.Table(
@@ -37,21 +98,222 @@ like_table = sqlalchemy.Table(
     sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
     sqlalchemy.Column("post_id", sqlalchemy.ForeignKey("posts.id"), nullable=False),
     sqlalchemy.Column("user_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    # 한 사용자가 같은 글에 여러 번 좋아요 못 하도록 (post_id 조회에도 사용됨)
+    # 운영 DB에 락 없이(CONCURRENTLY) 추가할 수 있게 제약조건 대신 unique index로
+    sqlalchemy.Index("uq_likes_post_id_user_id", "post_id", "user_id", unique=True),
+    sqlalchemy.Index("ix_likes_user_id", "user_id"),
 )
 
+follow_table = sqlalchemy.Table(
+    "follows",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("follower_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    sqlalchemy.Column("followee_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    # 팔로우한 사용자 목록 (피드를 읽을 때)
+    sqlalchemy.Index(
+        "uq_follows_follower_id_followee_id",
+        "follower_id",
+        "followee_id",
+        unique=True,
+    ),
+    # 팔로워 목록 (글을 타임라인에 뿌릴 때)
+    sqlalchemy.Index(
+        "ix_follows_followee_id_follower_id", "followee_id", "follower_id"
+    ),
+)
+
+# 팔로우한 사용자의 글을 쓰는 시점에 미리 넣어 두는 사용자별 피드 (fan-out-on-write)
+timeline_table = sqlalchemy.Table(
+    "timelines",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("user_id", sqlalchemy.ForeignKey("users.id"), nullable=False),
+    sqlalchemy.Column("post_id", sqlalchemy.ForeignKey("posts.id"), nullable=False),
+    # 피드 한 페이지 = (user_id, post_id) 범위를 역순으로 한 번 읽기
+    sqlalchemy.Index("uq_timelines_user_id_post_id", "user_id", "post_id", unique=True),
+)
+
+# -- 전문 검색 (posts.body, comments.body)
+# sqlite(개발/테스트)는 FTS5, postgres는 to_tsvector 식에 GIN 인덱스
+# 둘 다 INSERT/UPDATE/DELETE 때 DB가 알아서 갱신 (sqlite는 트리거로)
+search_tables = ("posts", "comments")
+
+
+def fts5_ddl(table: str) -> list[str]:
+    fts = f"{table}_fts"
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, body) VALUES ('delete', old.id, old.body);"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, body) VALUES (new.id, new.body);"
+
+    return [
+        # 본문은 원래 테이블에만 두고(external content) 색인만
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(body, content='{table}',"
+        " content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF body ON {table}"
+        f" BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def tsvector_index_ddl(table: str) -> str:
+    # 검색 쿼리의 식(search.document)과 글자 그대로 같아야 인덱스를 탐
+    return (
+        f"CREATE INDEX ix_{table}_body_search ON {table}"
+        f" USING gin (to_tsvector('english', coalesce(body, '')))"
+    )
+
+
+def is_search_table(name: str) -> bool:
+    """FTS5 가상 테이블과 그림자 테이블(posts_fts_data 등), alembic 비교에서 제외"""
+    return name.startswith(tuple(f"{table}_fts" for table in search_tables))
+
+
+for search_table in (post_table, comment_table):
+    for statement in fts5_ddl(search_table.name):
+        sqlalchemy.event.listen(
+            search_table,
+            "after_create",
+            sqlalchemy.DDL(statement).execute_if(dialect="sqlite"),
+        )
+    sqlalchemy.event.listen(
+        search_table,
+        "after_create",
+        sqlalchemy.DDL(tsvector_index_ddl(search_table.name)).execute_if(
+            dialect="postgresql"
+        ),
+    )
+    sqlalchemy.event.listen(
+        search_table,
+        "before_drop",
+        sqlalchemy.DDL(f"DROP TABLE IF EXISTS {search_table.name}_fts").execute_if(
+            dialect="sqlite"
+        ),
+    )
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """sqlite는 커넥션마다 외래 키 검사를 켜야 함 (기본값 off)
+
+    aiosqlite(databases)는 sqlite3.connect(factory=...)로 넘겨서 사용
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.execute("PRAGMA foreign_keys = ON")
+
 
-connect_args = {"check_same_thread": False} if "sqlite" in config.DATABASE_URL else {}
+connect_args = (
+    {"check_same_thread": False, "factory": SQLiteConnection}
+    if "sqlite" in config.DATABASE_URL
+    else {}
+)
 engine = sqlalchemy.create_engine(config.DATABASE_URL, connect_args=connect_args)
 
+# -- 스키마는 import 시점의 create_all 대신 alembic 마이그레이션으로 관리
+# $ alembic upgrade head
+
+
+class Database(databases.Database):
+    """쿼리마다 이름을 붙여(name=) 실행 시간을 로깅하고 메트릭으로 남기는 databases.Database
+
+    name을 주지 않으면 select/insert 같은 쿼리 종류로 기록된다.
+    """
+
+    @contextmanager
+    def _observe(
+        self, operation: str, name: str | None, query: ClauseElement | str, values: Any
+    ) -> Iterator[None]:
+        name = name or query_kind(query)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            DB_QUERY_DURATION.labels(name, operation).observe(elapsed)
+            query_logger.log(name, query, values, elapsed)
+
+    async def fetch_all(self, query, values=None, *, name: str | None = None):
+        with self._observe("fetch_all", name, query, values):
+            return await super().fetch_all(query, values)
+
+    async def fetch_one(self, query, values=None, *, name: str | None = None):
+        with self._observe("fetch_one", name, query, values):
+            return await super().fetch_one(query, values)
+
+    async def fetch_val(self, query, values=None, column=0, *, name: str | None = None):
+        with self._observe("fetch_val", name, query, values):
+            return await super().fetch_val(query, values, column=column)
+
+    async def execute(self, query, values=None, *, name: str | None = None):
+        with self._observe("execute", name, query, values):
+            return await super().execute(query, values)
+
+    async def execute_many(self, query, values: list, *, name: str | None = None):
+        with self._observe("execute_many", name, query, None):
+            return await super().execute_many(query, values)
+
+    async def iterate(
+        self, query, values=None, *, name: str | None = None
+    ) -> AsyncGenerator[Any, None]:
+        # 스트리밍은 전체 소요 시간으로 기록
+        with self._observe("iterate", name, query, values):
+            async for record in super().iterate(query, values):
+                yield record
+
+
+def query_kind(query: ClauseElement | str) -> str:
+    if isinstance(query, str):
+        return "text"
 
-metadata.create_all(engine)
-# -- 데이터베이스 생성
+    return query.__visit_name__
 
 
-# 최대 커넥션이 5개인 경우에도 앱 이외의 커넥션을 생각해 줄이기
-db_args = {"min_size": 1, "max_size": 3} if "postgres" in config.DATABASE_URL else {}
-database = databases.Database(
-    config.DATABASE_URL, force_rollback=config.DB_FORCE_ROLL_BACK, **db_args
+def pool_args(url: str) -> dict:
+    """asyncpg.create_pool로 넘어가는 옵션, sqlite는 sqlite3.connect로 넘어감"""
+    if "sqlite" in url:
+        return {"factory": SQLiteConnection}
+    if "postgres" not in url:
+        return {}
+
+    return {
+        "min_size": config.DB_POOL_MIN_SIZE,
+        "max_size": config.DB_POOL_MAX_SIZE,
+        "timeout": config.DB_CONNECT_TIMEOUT_SECONDS,
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+database = Database(
+    config.DATABASE_URL,
+    force_rollback=config.DB_FORCE_ROLL_BACK,
+    **pool_args(config.DATABASE_URL),
 )
 
+# 읽기 전용 replica, 쓰기는 항상 primary(database)로
+read_replicas = [Database(url, **pool_args(url)) for url in config.DATABASE_READ_URLS]
+_next_replica = itertools.count()
+
+
+def read_database() -> Database:
+    """replica를 돌아가며 하나씩, 없으면 primary"""
+    if not read_replicas:
+        return database
+
+    return read_replicas[next(_next_replica) % len(read_replicas)]
+
+
 # -- 데이터베이스 연결 및 사용
+
+# ON CONFLICT(on_conflict_do_nothing 등)는 방언별 insert에만 있음
+dialect_insert = (
+    postgresql.insert if "postgres" in config.DATABASE_URL else sqlite.insert
+)
+
+# 드라이버마다 제약조건 위반 예외가 달라서 한 번에 잡을 수 있게
+integrity_errors = (
+    sqlite3.IntegrityError,
+    asyncpg.exceptions.IntegrityConstraintViolationError,
+)
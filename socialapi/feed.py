@@ -0,0 +1,144 @@
+import logging
+
+import sqlalchemy
+
+from socialapi.config import config
+from socialapi.database import (
+    database,
+    dialect_insert,
+    follow_table,
+    post_table,
+    timeline_table,
+    user_table,
+)
+
+logger = logging.getLogger(__name__)
+
+timeline_key = [timeline_table.c.user_id, timeline_table.c.post_id]
+
+# ix_posts_user_id_id_not_fanned_out의 WHERE와 같은 식이어야 인덱스를 탐
+not_fanned_out = sqlalchemy.text("NOT posts.fanned_out")
+
+
+def fan_out_query(author_id: int, post_ids: list[int]) -> sqlalchemy.Insert:
+    """작성자의 팔로워 타임라인마다 글을 넣기"""
+    rows = (
+        sqlalchemy.select(follow_table.c.follower_id, post_table.c.id)
+        .select_from(
+            follow_table.join(
+                post_table, post_table.c.user_id == follow_table.c.followee_id
+            )
+        )
+        .where(
+            follow_table.c.followee_id == author_id,
+            post_table.c.id.in_(post_ids),
+        )
+    )
+
+    return (
+        dialect_insert(timeline_table)
+        .from_select(["user_id", "post_id"], rows)
+        .on_conflict_do_nothing(index_elements=timeline_key)
+    )
+
+
+async def fan_out_posts(author_id: int, post_ids: list[int]) -> None:
+    """create_post 응답을 보낸 뒤 BackgroundTasks로 실행
+
+    팔로워가 많은 사용자(celebrity)는 글마다 타임라인 행을 수만 개 쓰는 대신
+    fanned_out = false로 두고 피드를 읽을 때 가져옴 (fan-out-on-read).
+    나중에 팔로워 수가 기준 아래로 내려가도 이 글들은 계속 읽을 때 가져옴
+    """
+    query = sqlalchemy.select(user_table.c.follower_count).where(
+        user_table.c.id == author_id
+    )
+    mark_fanned_out = (
+        post_table.update().where(post_table.c.id.in_(post_ids)).values(fanned_out=True)
+    )
+
+    try:
+        followers = await database.fetch_val(query, name="get_follower_count")
+        if followers is None or followers >= config.FEED_FAN_OUT_MAX_FOLLOWERS:
+            return
+
+        async with database.transaction():
+            await database.execute(
+                fan_out_query(author_id, post_ids), name="fan_out_posts"
+            )
+            await database.execute(mark_fanned_out, name="mark_fanned_out")
+    except Exception:
+        # 응답은 이미 나갔으니 로그만, fanned_out이 false로 남아 읽을 때 가져옴
+        logger.exception(f"Failed to fan out posts {post_ids} of user {author_id}")
+
+
+def backfill_query(follower_id: int, followee_id: int) -> sqlalchemy.Insert:
+    """새로 팔로우한 사용자의 최근 글을 타임라인에 채우기"""
+    recent_posts = (
+        sqlalchemy.select(
+            # SELECT 목록의 파라미터는 postgres가 text로 추론해서 CAST
+            sqlalchemy.cast(sqlalchemy.literal(follower_id), sqlalchemy.Integer),
+            post_table.c.id,
+        )
+        .where(post_table.c.user_id == followee_id)
+        .order_by(post_table.c.id.desc())
+        .limit(config.FEED_BACKFILL_SIZE)
+    )
+
+    return (
+        dialect_insert(timeline_table)
+        .from_select(["user_id", "post_id"], recent_posts)
+        .on_conflict_do_nothing(index_elements=timeline_key)
+    )
+
+
+def remove_query(follower_id: int, followee_id: int) -> sqlalchemy.Delete:
+    followee_posts = sqlalchemy.select(post_table.c.id).where(
+        post_table.c.user_id == followee_id
+    )
+
+    return timeline_table.delete().where(
+        timeline_table.c.user_id == follower_id,
+        timeline_table.c.post_id.in_(followee_posts),
+    )
+
+
+def feed_post_ids(
+    user_id: int, limit: int, before: int | None = None
+) -> sqlalchemy.Subquery:
+    """피드에 보일 글 id를 최신 순으로 limit개까지
+
+    미리 넣어 둔 타임라인 범위 + 팔로우한 사용자의 fan-out 하지 않은 글 (fan-out-on-read).
+    backfill로 양쪽에 다 있는 글은 UNION으로 하나만
+    """
+    fanned = sqlalchemy.select(timeline_table.c.post_id.label("post_id")).where(
+        timeline_table.c.user_id == user_id
+    )
+    # 팔로우한 사용자마다 부분 인덱스에서 최신 limit개만 읽기 (follows 행마다 상관 서브쿼리)
+    recent = sqlalchemy.select(post_table.c.id).where(
+        post_table.c.user_id == follow_table.c.followee_id, not_fanned_out
+    )
+    if before is not None:
+        fanned = fanned.where(timeline_table.c.post_id < before)
+        recent = recent.where(post_table.c.id < before)
+    recent = recent.order_by(post_table.c.id.desc()).limit(limit)
+
+    if "postgres" in config.DATABASE_URL:
+        followee_posts = recent.lateral("followee_posts")
+        pulled = sqlalchemy.select(followee_posts.c.id.label("post_id")).select_from(
+            follow_table.join(followee_posts, sqlalchemy.true())
+        )
+    else:
+        # sqlite에는 LATERAL이 없어서 IN (상관 서브쿼리)로 같은 모양을 만듦
+        followee_posts = post_table.alias("followee_posts")
+        pulled = sqlalchemy.select(followee_posts.c.id.label("post_id")).select_from(
+            follow_table.join(followee_posts, followee_posts.c.id.in_(recent))
+        )
+    pulled = pulled.where(follow_table.c.follower_id == user_id)
+
+    # 각각 limit개까지만 남기고 합치기 (정렬은 팔로우 수 x limit개 안에서만)
+    fanned = fanned.order_by(timeline_table.c.post_id.desc()).limit(limit).subquery()
+    pulled = pulled.order_by(sqlalchemy.desc("post_id")).limit(limit).subquery()
+
+    return sqlalchemy.union(
+        sqlalchemy.select(fanned.c.post_id), sqlalchemy.select(pulled.c.post_id)
+    ).subquery()
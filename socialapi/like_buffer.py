@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Iterable
+
+import sqlalchemy
+
+from socialapi.config import config
+from socialapi.database import (
+    Database,
+    database,
+    dialect_insert,
+    like_table,
+    post_table,
+)
+from socialapi.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+LikeKey = tuple[int, int]
+
+
+class LikeBuffer:
+    """좋아요를 바로 INSERT하지 않고 모았다가 한 트랜잭션으로 쓰기 (write-behind)
+
+    (post_id, user_id)로 중복을 없애고, window가 지나거나 max_size만큼 모이면 flush.
+    아직 쓰지 않은 좋아요도 pending()으로 개수에 더해서 보여준다.
+    프로세스가 죽으면 flush 전의 좋아요는 사라지므로 종료할 때 stop()으로 비워야 함
+    """
+
+    def __init__(self, db: Database, enabled: bool, window: float, max_size: int):
+        self.db = db
+        self.enabled = enabled
+        self.window = window
+        self.max_size = max_size
+        self._pending: set[LikeKey] = set()
+        self._flushing: set[LikeKey] = set()
+        self._counts: Counter[int] = Counter()
+        self._timer: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._pending)
+
+    def pending(self, post_id: int) -> int:
+        return self._counts[post_id]
+
+    def has_pending(self) -> bool:
+        return bool(self._counts)
+
+    def contains(self, post_id: int, user_id: int) -> bool:
+        key = (post_id, user_id)
+        return key in self._pending or key in self._flushing
+
+    async def add(self, post_id: int, user_id: int) -> bool:
+        """새로 쌓였으면 True, 이미 기다리는 중이면 False"""
+        if self.contains(post_id, user_id):
+            return False
+
+        self._pending.add((post_id, user_id))
+        self._counts[post_id] += 1
+        # 캐시된 목록/상세에도 아직 쓰지 않은 좋아요가 보이도록
+        self._invalidate([post_id])
+
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        return True
+
+    def discard(self, post_id: int, user_id: int) -> bool:
+        """아직 flush 전이면 취소 (DB에 쓸 필요 없음)"""
+        key = (post_id, user_id)
+        if key not in self._pending:
+            return False
+
+        self._pending.remove(key)
+        self._uncount([key])
+        self._invalidate([post_id])
+        return True
+
+    async def settle(self, post_id: int, user_id: int) -> None:
+        """flush 중인 좋아요가 DB에 다 쓰일 때까지 기다리기"""
+        if (post_id, user_id) in self._flushing:
+            async with self._lock:
+                pass
+
+    async def flush(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        async with self._lock:
+            if not self._pending:
+                return
+
+            self._flushing, self._pending = self._pending, set()
+            try:
+                await self._write(self._flushing)
+            except Exception:
+                logger.exception(f"Failed to flush {len(self._flushing)} likes")
+                # 개수는 그대로 두고 다음 flush에서 다시 시도
+                # 좋아요가 더 들어오지 않아도 다시 시도하도록 타이머를 새로
+                self._pending |= self._flushing
+                if self._timer is None:
+                    self._timer = asyncio.create_task(self._flush_later())
+            else:
+                self._uncount(self._flushing)
+            finally:
+                self._flushing = set()
+
+    async def stop(self) -> None:
+        await self.flush()
+        # 마지막 flush도 실패했으면 더 기다리지 않음 (남은 좋아요는 유실)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _write(self, likes: set[LikeKey]) -> None:
+        query = (
+            dialect_insert(like_table)
+            .values(
+                [{"post_id": post_id, "user_id": user_id} for post_id, user_id in likes]
+            )
+            .on_conflict_do_nothing(
+                index_elements=[like_table.c.post_id, like_table.c.user_id]
+            )
+            .returning(like_table.c.post_id)
+        )
+
+        async with self.db.transaction():
+            created = await self.db.fetch_all(query, name="flush_likes")
+            # 이미 DB에 있던 좋아요(ON CONFLICT)는 개수에 더하지 않음
+            deltas = Counter(row.post_id for row in created)
+            if deltas:
+                # 게시글마다 UPDATE하지 않고 CASE로 한 번에
+                count_query = (
+                    post_table.update()
+                    .where(post_table.c.id.in_(deltas))
+                    .values(
+                        like_count=post_table.c.like_count
+                        + sqlalchemy.case(deltas, value=post_table.c.id)
+                    )
+                )
+                await self.db.execute(count_query, name="flush_like_counts")
+
+        self._invalidate(deltas)
+        logger.debug(f"Flushed {len(likes)} likes to {len(deltas)} posts")
+
+    def _invalidate(self, post_ids: Iterable[int]) -> None:
+        response_cache.bump("posts", *(("post", post_id) for post_id in post_ids))
+
+    def _uncount(self, likes: set[LikeKey]) -> None:
+        for post_id, _ in likes:
+            self._counts[post_id] -= 1
+            if self._counts[post_id] <= 0:
+                del self._counts[post_id]
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+
+like_buffer = LikeBuffer(
+    database,
+    enabled=config.LIKE_BUFFER_ENABLED,
+    window=config.LIKE_BUFFER_FLUSH_INTERVAL_SECONDS,
+    max_size=config.LIKE_BUFFER_MAX_SIZE,
+)
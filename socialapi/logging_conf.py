@@ -1,5 +1,9 @@
+import copy
 import logging
+import queue
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+from typing import Literal
 
 from socialapi.config import DevConfig, ProdConfig, config
 
@@ -26,6 +30,94 @@ class EmailObfuscationFilter(logging.Filter):
         return True
 
 
+class BoundedQueueHandler(QueueHandler):
+    """큐가 가득 찼을 때 이벤트 루프를 막을지(block), 버릴지(drop_new/drop_oldest)"""
+
+    def __init__(
+        self, maxsize: int, drop_policy: Literal["block", "drop_new", "drop_oldest"]
+    ) -> None:
+        super().__init__(queue.Queue(maxsize))
+        self.drop_policy = drop_policy
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.drop_policy == "block":
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.drop_policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+
+        self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """기본 prepare는 traceback을 message에 합쳐버려서 JSON 로그의 exc_info 필드가 사라짐
+
+        message와 traceback(exc_text)을 따로 두고, 큐로 넘기기 위해 exc_info만 지우기
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+
+        return record
+
+
+queue_listener: QueueListener | None = None
+
+
+def start_queue_listener(loggers: list[logging.Logger]) -> QueueListener:
+    """loggers의 핸들러들을 백그라운드 스레드로 옮기고 큐 핸들러 하나로 교체
+
+    correlation_id 같은 필터는 contextvar를 읽으니 요청 쪽(큐 핸들러)에서 실행해야 한다.
+    필터를 떼어낸 핸들러를 쓰는 logger는 모두 loggers에 넣어야 레코드에 필터 값이 채워짐
+    """
+    queue_handler = BoundedQueueHandler(
+        config.LOG_QUEUE_MAX_SIZE, config.LOG_QUEUE_DROP_POLICY
+    )
+
+    targets = []
+    for logger in loggers:
+        for handler in logger.handlers:
+            if handler not in targets:
+                targets.append(handler)
+        logger.handlers = [queue_handler]
+
+    for handler in targets:
+        for handler_filter in handler.filters:
+            if handler_filter not in queue_handler.filters:
+                queue_handler.addFilter(handler_filter)
+        handler.filters = []
+
+    listener = QueueListener(queue_handler.queue, *targets, respect_handler_level=True)
+    listener.start()
+
+    return listener
+
+
+def stop_logging() -> None:
+    """남은 로그를 모두 쓰고 백그라운드 스레드 종료"""
+    global queue_listener
+
+    if queue_listener is not None:
+        queue_listener.stop()
+        queue_listener = None
+
+
 filters = ["correlation_id", "email_obfuscation"]
 handlers = ["default", "rotating_file"]
 if isinstance(config, ProdConfig):
@@ -33,6 +125,9 @@ if isinstance(config, ProdConfig):
 
 
 def configure_logging() -> None:
+    global queue_listener
+
+    stop_logging()
     dictConfig(
         {
             "version": 1,
@@ -94,6 +189,9 @@ def configure_logging() -> None:
                     "level": "DEBUG" if isinstance(config, DevConfig) else "INFO",
                     "propagate": False,
                 },
+                "socialapi.query_logging": {
+                    "level": config.SQL_LOG_LEVEL or "NOTSET",
+                },
                 "databases": {
                     "handlers": ["default"],
                     "level": "WARNING",
@@ -105,3 +203,12 @@ def configure_logging() -> None:
             },
         }
     )
+
+    # 포맷팅과 파일 쓰기를 이벤트 루프 밖으로
+    if config.LOG_QUEUE_ENABLED:
+        queue_listener = start_queue_listener(
+            [
+                logging.getLogger(name)
+                for name in ["uvicorn", "socialapi", "databases", "aiosqlite"]
+            ]
+        )
@@ -2,11 +2,17 @@ import logging
 from contextlib import asynccontextmanager
 
 from asgi_correlation_id import CorrelationIdMiddleware
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.exception_handlers import http_exception_handler
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
-from socialapi.database import database
-from socialapi.logging_conf import configure_logging
+from socialapi import security, tasks
+from socialapi.database import database, read_replicas
+from socialapi.like_buffer import like_buffer
+from socialapi.logging_conf import configure_logging, stop_logging
+from socialapi.metrics import AppCollector, PrometheusMiddleware
+from socialapi.response_cache import response_cache
+from socialapi.routers.feed import router as feed_router
 from socialapi.routers.post import router as post_router
 from socialapi.routers.user import router as user_router
 
@@ -19,15 +25,48 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     configure_logging()
     await database.connect()
+    for replica in read_replicas:
+        await replica.connect()
+    await tasks.startup()
     yield
+    # DB 연결을 끊기 전에 쌓인 좋아요부터
+    await like_buffer.stop()
+    await tasks.shutdown()
+    for replica in read_replicas:
+        await replica.disconnect()
     await database.disconnect()
+    security.password_hasher.shutdown()
+    stop_logging()
 
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(CorrelationIdMiddleware)
+app.add_middleware(PrometheusMiddleware)
+
+REGISTRY.register(
+    AppCollector(
+        databases={
+            "primary": database,
+            **{f"replica_{i}": replica for i, replica in enumerate(read_replicas)},
+        },
+        password_hasher=security.password_hasher,
+        caches={
+            "user": security.user_cache,
+            "token": security.token_cache,
+            "response": response_cache.store,
+        },
+        mail_queue=tasks.mail_queue,
+    )
+)
 
 app.include_router(post_router, prefix="/posts")
 app.include_router(user_router)
+app.include_router(feed_router)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.exception_handler(HTTPException)
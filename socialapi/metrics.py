@@ -0,0 +1,115 @@
+import time
+from typing import Iterable
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+RESPONSES = Counter(
+    "http_responses_total",
+    "HTTP responses by route template and status code",
+    ["method", "route", "status"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent in database calls by query name",
+    ["name", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+class PrometheusMiddleware:
+    """라우트 템플릿(/posts/{post_id}) 단위로 지연 시간/상태 코드 기록"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # 라우터가 매칭한 route를 scope에 남겨줌, 실제 경로를 쓰면 라벨이 무한히 늘어남
+            route = scope.get("route")
+            route_path = getattr(route, "path", "<unmatched>")
+            REQUEST_LATENCY.labels(scope["method"], route_path).observe(
+                time.perf_counter() - started
+            )
+            RESPONSES.labels(scope["method"], route_path, str(status)).inc()
+
+
+class AppCollector(Collector):
+    """스크레이프할 때마다 커넥션 풀/해싱 executor/캐시/메일 큐 상태를 읽어오기"""
+
+    def __init__(self, databases: dict, password_hasher, caches: dict, mail_queue):
+        self.databases = databases
+        self.password_hasher = password_hasher
+        self.caches = caches
+        self.mail_queue = mail_queue
+
+    def collect(self) -> Iterable[Metric]:
+        pool_size = GaugeMetricFamily(
+            "db_pool_size", "Open connections in the pool", labels=["database"]
+        )
+        pool_idle = GaugeMetricFamily(
+            "db_pool_idle", "Idle connections in the pool", labels=["database"]
+        )
+        pool_max = GaugeMetricFamily(
+            "db_pool_max_size", "Configured pool max_size", labels=["database"]
+        )
+        for name, database in self.databases.items():
+            # asyncpg 풀만 크기를 알려줌 (sqlite는 없음)
+            pool = getattr(database._backend, "_pool", None)
+            if not hasattr(pool, "get_size"):
+                continue
+            pool_size.add_metric([name], pool.get_size())
+            pool_idle.add_metric([name], pool.get_idle_size())
+            pool_max.add_metric([name], pool.get_max_size())
+        yield from (pool_size, pool_idle, pool_max)
+
+        stats = self.password_hasher.stats
+        yield GaugeMetricFamily(
+            "password_hash_in_flight", "Password hashes running", value=stats.in_flight
+        )
+        yield GaugeMetricFamily(
+            "password_hash_waiting",
+            "Password hashes waiting for a worker",
+            value=stats.waiting,
+        )
+        yield CounterMetricFamily(
+            "password_hash", "Password hashes completed", value=stats.completed
+        )
+
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        for name, cache in self.caches.items():
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+        yield from (hits, misses)
+
+        yield GaugeMetricFamily(
+            "mail_queue_size", "Emails waiting to be sent", value=self.mail_queue.size
+        )
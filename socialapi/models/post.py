@@ -17,6 +17,12 @@ class UserPostWithLikes(UserPost):
     model_config = ConfigDict(from_attributes=True)
 
     likes: int
+    comment_count: int
+
+
+class UserPostPage(BaseModel):
+    posts: list[UserPostWithLikes]
+    next_cursor: str | None = None
 
 
 class CommentIn(BaseModel):
@@ -31,9 +37,19 @@ class Comment(CommentIn):
     user_id: int
 
 
+class CommentPage(BaseModel):
+    comments: list[Comment]
+    next_cursor: str | None = None
+
+
 class UserPostWithComments(BaseModel):
     post: UserPostWithLikes
     comments: list[Comment]
+    next_cursor: str | None = None
+
+
+class PostLookup(BaseModel):
+    posts: list[UserPostWithComments]
 
 
 class PostLikeIn(BaseModel):
@@ -43,3 +59,8 @@ class PostLikeIn(BaseModel):
 class PostLike(PostLikeIn):
     id: int
     user_id: int
+
+
+class PostLikeState(PostLikeIn):
+    liked: bool
+    likes: int
@@ -8,3 +8,12 @@ class User(BaseModel):
 
 class UserIn(User):
     password: str
+
+
+class FollowIn(BaseModel):
+    user_id: int
+
+
+class FollowState(FollowIn):
+    following: bool
+    followers: int
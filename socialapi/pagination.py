@@ -0,0 +1,49 @@
+import base64
+import json
+import math
+
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# DB 정수 컬럼(BIGINT, sqlite INTEGER) 범위, 벗어나면 드라이버에서 OverflowError
+MIN_POSITION = -(2**63)
+MAX_POSITION = 2**63 - 1
+
+
+def encode_cursor(**position) -> str:
+    # 클라이언트는 내용을 몰라도 되니 opaque하게 base64로 감싸기
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *fields: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError as e:
+        raise invalid_cursor_exception() from e
+
+    if not isinstance(position, dict) or not all(
+        is_position(position.get(field)) for field in fields
+    ):
+        raise invalid_cursor_exception()
+
+    return position
+
+
+def is_position(value) -> bool:
+    # bool은 int의 하위 타입, json은 NaN/Infinity도 float로 읽음
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    if isinstance(value, float) and not math.isfinite(value):
+        return False
+
+    return MIN_POSITION <= value <= MAX_POSITION
+
+
+def invalid_cursor_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+    )
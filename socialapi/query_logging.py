@@ -0,0 +1,109 @@
+import logging
+import random
+import re
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy.sql import ClauseElement
+
+from socialapi.config import DevConfig, config
+from socialapi.logging_conf import obfuscated
+
+logger = logging.getLogger(__name__)
+
+# 바인딩 이름 뒤에 붙는 _1, _2 같은 번호를 떼고 컬럼 이름으로 비교
+BIND_SUFFIX = re.compile(r"_\d+$")
+
+
+class QueryLogger:
+    """쿼리를 JSON 필드(query_name, query_params, elapsed_ms)와 함께 로깅
+
+    - DEBUG가 꺼져 있거나 샘플링에서 빠지면 SQL 문자열을 만들지 않음
+    - 같은 모양의 쿼리는 한 번만 컴파일하고 캐시 (바인딩 값만 다시 뽑음)
+    - password는 가리고 email은 obfuscated()로 일부만 남김
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample_rate: float,
+        maxsize: int = 512,
+        obfuscated_length: int = 0,
+    ):
+        self.logger = logger
+        self.sample_rate = sample_rate
+        self.maxsize = maxsize
+        self.obfuscated_length = obfuscated_length
+        self._compiled: OrderedDict[Any, tuple[Any, str]] = OrderedDict()
+
+    def sampled(self) -> bool:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return False
+
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def render(
+        self, query: ClauseElement | str, values: dict | None = None
+    ) -> tuple[str, dict]:
+        if isinstance(query, str):
+            return query, dict(values or {})
+
+        # sqlalchemy가 자체 컴파일 캐시에 쓰는 키, 바인딩 값은 key.bindparams에 따로 있음
+        cache_key = query._generate_cache_key()
+        if cache_key is None:
+            compiled = query.compile()
+            return str(compiled), {**compiled.params, **(values or {})}
+
+        entry = self._compiled.get(cache_key.key)
+        if entry is None:
+            compiled = query.compile(cache_key=cache_key)
+            entry = (compiled, str(compiled))
+            self._compiled[cache_key.key] = entry
+            if len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+        else:
+            self._compiled.move_to_end(cache_key.key)
+
+        compiled, sql = entry
+        params = compiled.construct_params(extracted_parameters=cache_key.bindparams)
+
+        return sql, {**params, **(values or {})}
+
+    def masked(self, params: dict) -> dict:
+        masked = {}
+        for key, value in params.items():
+            column = BIND_SUFFIX.sub("", key)
+            if column == "password" and value is not None:
+                value = "********"
+            elif column == "email" and isinstance(value, str) and "@" in value:
+                value = obfuscated(value, self.obfuscated_length)
+            masked[key] = value
+
+        return masked
+
+    def log(
+        self,
+        name: str,
+        query: ClauseElement | str,
+        values: dict | None,
+        elapsed: float,
+    ) -> None:
+        if not self.sampled():
+            return
+
+        sql, params = self.render(query, values)
+        self.logger.debug(
+            sql,
+            extra={
+                "query_name": name,
+                "query_params": self.masked(params),
+                "elapsed_ms": round(elapsed * 1000, 3),
+            },
+        )
+
+
+query_logger = QueryLogger(
+    logger,
+    sample_rate=config.SQL_LOG_SAMPLE_RATE,
+    obfuscated_length=2 if isinstance(config, DevConfig) else 0,
+)
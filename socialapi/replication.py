@@ -0,0 +1,26 @@
+from fastapi import Request, Response
+
+from socialapi import database as db
+from socialapi.config import config
+
+# 방금 쓴 사용자는 복제 지연 동안 자기 글이 안 보일 수 있으니 쿠키로 표시해두고 primary에서 읽기
+RECENT_WRITE_COOKIE = "recent_write"
+
+
+def mark_recent_write(response: Response) -> None:
+    if not db.read_replicas:
+        return
+
+    response.set_cookie(
+        RECENT_WRITE_COOKIE,
+        "1",
+        max_age=config.READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+    )
+
+
+def get_read_database(request: Request) -> db.Database:
+    if RECENT_WRITE_COOKIE in request.cookies:
+        return db.database
+
+    return db.read_database()
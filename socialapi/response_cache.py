@@ -0,0 +1,114 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from socialapi.cache import CacheStore, TTLCache
+from socialapi.config import config
+from socialapi.replication import RECENT_WRITE_COOKIE
+
+Serializer = Callable[[Any], bytes]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    last_modified: float
+
+
+class ResponseCache:
+    """누가 요청해도 같은 공개 GET 응답을 직렬화된 채로 캐시
+
+    키는 (경로, 쿼리 파라미터, 관련 scope들의 버전). 쓰기가 일어나면 bump()로
+    버전을 올려서 이전 항목은 더 이상 참조되지 않고 LRU/TTL로 밀려난다.
+    """
+
+    def __init__(self, store: CacheStore):
+        self.store = store
+        self._started = time.time()
+        self._versions: dict[Hashable, tuple[int, float]] = {}
+
+    def versions(self, scopes: Iterable[Hashable]) -> tuple[tuple[int, float], ...]:
+        return tuple(self._versions.get(scope, (0, self._started)) for scope in scopes)
+
+    def bump(self, *scopes: Hashable) -> None:
+        now = time.time()
+        for scope in scopes:
+            version, _ = self._versions.get(scope, (0, now))
+            self._versions[scope] = (version + 1, now)
+
+    def clear(self) -> None:
+        self.store.clear()
+        self._versions.clear()
+
+    async def respond(
+        self,
+        request: Request,
+        scopes: Iterable[Hashable],
+        serialize: Serializer,
+        load: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        # 방금 쓴 사용자는 primary에서 새로 읽어야 하니 캐시를 거치지 않음
+        if RECENT_WRITE_COOKIE in request.cookies:
+            return json_response(serialize(await load()))
+
+        versions = self.versions(scopes)
+        params = tuple(sorted(request.query_params.multi_items()))
+        key = (request.url.path, params, versions)
+
+        entry = self.store.get(key)
+        if entry is None:
+            body = serialize(await load())
+            entry = CachedResponse(
+                body=body,
+                etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+                last_modified=max(modified for _, modified in versions),
+            )
+            self.store.set(key, entry)
+
+        headers = {
+            "ETag": entry.etag,
+            "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+            # 저장은 하되 매번 ETag로 재검증
+            "Cache-Control": "no-cache",
+        }
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+
+        return json_response(entry.body, headers)
+
+
+def validated(model: type[BaseModel]) -> Serializer:
+    """response_model처럼 pydantic으로 검증해서 직렬화"""
+
+    def serialize(data: Any) -> bytes:
+        return model.model_validate(data).model_dump_json().encode()
+
+    return serialize
+
+
+def json_response(body: bytes, headers: dict | None = None) -> Response:
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # 약한 비교 (W/"..."도 같은 것으로)
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+response_cache = ResponseCache(
+    TTLCache(
+        maxsize=config.RESPONSE_CACHE_MAX_SIZE, ttl=config.RESPONSE_CACHE_TTL_SECONDS
+    )
+)
@@ -0,0 +1,165 @@
+import logging
+from typing import Annotated
+
+import sqlalchemy
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from socialapi.database import (
+    Database,
+    database,
+    dialect_insert,
+    follow_table,
+    post_table,
+    user_table,
+)
+from socialapi.feed import backfill_query, feed_post_ids, remove_query
+from socialapi.models.post import UserPostPage
+from socialapi.models.user import FollowIn, FollowState, User
+from socialapi.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+from socialapi.replication import get_read_database, mark_recent_write
+from socialapi.routers.post import select_post_and_likes, with_pending_likes
+from socialapi.security import get_current_user
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+follow_key = [follow_table.c.follower_id, follow_table.c.followee_id]
+
+
+async def follower_count_after(user_id: int, delta: int) -> int | None:
+    """routers.post.like_count_after와 같이, 사용자가 없으면 None"""
+    if delta:
+        query = (
+            user_table.update()
+            .where(user_table.c.id == user_id)
+            .values(follower_count=user_table.c.follower_count + delta)
+            .returning(user_table.c.follower_count)
+        )
+        return await database.fetch_val(query, name="update_follower_count")
+
+    query = sqlalchemy.select(user_table.c.follower_count).where(
+        user_table.c.id == user_id
+    )
+    return await database.fetch_val(query, name="get_follower_count")
+
+
+def raise_for_self_follow(follow: FollowIn, current_user: User) -> None:
+    if follow.user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot follow yourself")
+
+
+@router.post("/follow", response_model=FollowState)
+async def follow_user(
+    follow: FollowIn,
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+):
+    """좋아요처럼 여러 번 눌러도 팔로우는 하나"""
+    logger.info("Following user")
+    raise_for_self_follow(follow, current_user)
+
+    user_exists = (
+        sqlalchemy.select(user_table.c.id)
+        .where(user_table.c.id == follow.user_id)
+        .exists()
+    )
+    query = (
+        dialect_insert(follow_table)
+        .from_select(
+            ["follower_id", "followee_id"],
+            sqlalchemy.select(
+                sqlalchemy.cast(
+                    sqlalchemy.literal(current_user.id), sqlalchemy.Integer
+                ),
+                sqlalchemy.cast(sqlalchemy.literal(follow.user_id), sqlalchemy.Integer),
+            ).where(user_exists),
+        )
+        .on_conflict_do_nothing(index_elements=follow_key)
+        .returning(follow_table.c.id)
+    )
+
+    async with database.transaction():
+        follow_id = await database.fetch_val(query, name="follow_user")
+        followers = await follower_count_after(follow.user_id, 1 if follow_id else 0)
+        if follow_id:
+            # 팔로우하기 전의 글도 피드에 보이도록
+            await database.execute(
+                backfill_query(current_user.id, follow.user_id), name="backfill_feed"
+            )
+
+    if followers is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if follow_id:
+        mark_recent_write(response)
+
+    return {"user_id": follow.user_id, "following": True, "followers": followers}
+
+
+@router.post("/unfollow", response_model=FollowState)
+async def unfollow_user(
+    follow: FollowIn,
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+):
+    logger.info("Unfollowing user")
+    raise_for_self_follow(follow, current_user)
+
+    query = (
+        follow_table.delete()
+        .where(
+            follow_table.c.follower_id == current_user.id,
+            follow_table.c.followee_id == follow.user_id,
+        )
+        .returning(follow_table.c.id)
+    )
+
+    async with database.transaction():
+        follow_id = await database.fetch_val(query, name="unfollow_user")
+        followers = await follower_count_after(follow.user_id, -1 if follow_id else 0)
+        if follow_id:
+            await database.execute(
+                remove_query(current_user.id, follow.user_id), name="remove_from_feed"
+            )
+
+    if followers is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if follow_id:
+        mark_recent_write(response)
+
+    return {"user_id": follow.user_id, "following": False, "followers": followers}
+
+
+@router.get("/feed", response_model=UserPostPage)
+async def get_feed(
+    current_user: Annotated[User, Depends(get_current_user)],
+    read_db: Annotated[Database, Depends(get_read_database)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    """팔로우한 사용자들의 글을 최신 순으로 (사용자마다 달라서 response_cache는 안 씀)"""
+    logger.info("Getting feed")
+
+    before = decode_cursor(cursor, "id")["id"] if cursor else None
+    # 다음 페이지가 있는지 알기 위해 하나 더
+    post_ids = feed_post_ids(current_user.id, limit + 1, before)
+    query = (
+        select_post_and_likes.join(post_ids, post_ids.c.post_id == post_table.c.id)
+        .order_by(post_table.c.id.desc())
+        .limit(limit + 1)
+    )
+
+    posts = await read_db.fetch_all(query, name="get_feed")
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(id=posts[-1].id)
+
+    return {"posts": with_pending_likes(posts), "next_cursor": next_cursor}
@@ -1,22 +1,57 @@
+import json
 import logging
+from collections import Counter
 from enum import Enum
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
+import orjson
 import sqlalchemy
-from fastapi import APIRouter, Depends, HTTPException
-
-from socialapi.database import comment_table, database, like_table, post_table
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+
+from socialapi.config import config
+from socialapi.database import (
+    Database,
+    comment_table,
+    database,
+    dialect_insert,
+    like_table,
+    post_table,
+)
+from socialapi.feed import fan_out_posts
+from socialapi.like_buffer import like_buffer
 from socialapi.models.post import (
     Comment,
     CommentIn,
+    CommentPage,
     PostLike,
     PostLikeIn,
+    PostLikeState,
+    PostLookup,
     UserPost,
     UserPostIn,
+    UserPostPage,
     UserPostWithComments,
-    UserPostWithLikes,
 )
 from socialapi.models.user import User
+from socialapi.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+from socialapi.replication import get_read_database, mark_recent_write
+from socialapi.response_cache import response_cache, validated
+from socialapi.search import has_terms, search_scores
 from socialapi.security import get_current_user
 
 router = APIRouter()
@@ -25,129 +60,691 @@ logger = logging.getLogger(__name__)
 
 # promise처럼 바로 return 해도 되나?
 
-select_post_and_likes = (
-    sqlalchemy.select(post_table, sqlalchemy.func.count(like_table.c.id).label("likes"))
-    .select_from(post_table.outerjoin(like_table))
-    .group_by(post_table.c.id)
+select_post_and_likes = sqlalchemy.select(
+    post_table.c.id,
+    post_table.c.body,
+    post_table.c.user_id,
+    post_table.c.like_count.label("likes"),
+    post_table.c.comment_count,
 )
+# orjson은 str 하위 타입(quoted_name)을 키로 받지 않음
+post_and_likes_columns = tuple(
+    str(key) for key in select_post_and_likes.selected_columns.keys()
+)
+
+
+def with_pending_likes(posts: list) -> list:
+    """like_buffer에 쌓여 있는(아직 DB에 안 쓴) 좋아요까지 더한 개수로"""
+    if not like_buffer.has_pending():
+        return posts
+
+    return [
+        {
+            **{column: post[column] for column in post_and_likes_columns},
+            "likes": post["likes"] + like_buffer.pending(post["id"]),
+        }
+        for post in posts
+    ]
+
+
+def insert_if_post_exists(table: sqlalchemy.Table, data: dict) -> sqlalchemy.Insert:
+    """INSERT ... SELECT ... WHERE EXISTS (게시글), 게시글이 없으면 아무 행도 안 들어감
+
+    존재 확인(find_post)과 INSERT를 한 번의 왕복으로. 돌려받은 id가 없으면 404
+    """
+    post_exists = (
+        sqlalchemy.select(post_table.c.id)
+        .where(post_table.c.id == data["post_id"])
+        .exists()
+    )
+    # SELECT 목록의 파라미터는 postgres가 text로 추론해버려서 컬럼 타입으로 CAST
+    values = sqlalchemy.select(
+        *(
+            sqlalchemy.cast(sqlalchemy.literal(value), table.c[column].type)
+            for column, value in data.items()
+        )
+    ).where(post_exists)
+
+    return dialect_insert(table).from_select(list(data), values).returning(table.c.id)
+
 
+# 같은 사용자의 중복 좋아요는 uq_likes_post_id_user_id에 걸리고 ON CONFLICT로 무시
+like_key = [like_table.c.post_id, like_table.c.user_id]
 
-async def find_post(post_id: int):
-    logger.info(f"Finding post with id {post_id}")
-    query = post_table.select().where(post_table.c.id == post_id)
-    logger.debug(query)
 
-    return await database.fetch_one(query)
+async def like_count_after(post_id: int, delta: int) -> int | None:
+    """좋아요가 실제로 바뀌었으면 카운터를 갱신하고, 아니면 현재 값을 읽기만
+
+    어느 쪽이든 쿼리 한 번, 게시글이 없으면 None
+    """
+    if delta:
+        query = (
+            post_table.update()
+            .where(post_table.c.id == post_id)
+            .values(like_count=post_table.c.like_count + delta)
+            .returning(post_table.c.like_count)
+        )
+        return await database.fetch_val(query, name="update_like_count")
+
+    query = sqlalchemy.select(post_table.c.like_count).where(post_table.c.id == post_id)
+    return await database.fetch_val(query, name="get_like_count")
 
 
 @router.post("", response_model=UserPost, status_code=201)
 async def create_post(
-    post: UserPostIn, current_user: Annotated[User, Depends(get_current_user)]
+    post: UserPostIn,
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+    background_tasks: BackgroundTasks,
 ):
     logger.info("Creating post")
 
     data = {**dict(post), "user_id": current_user.id}
-    query = post_table.insert().values(data)
+    # fan_out_posts가 끝나기 전까지는 피드를 읽을 때 가져옴
+    query = post_table.insert().values({**data, "fanned_out": False})
 
-    logger.debug(query)
-
-    last_record_id = await database.execute(query)
+    last_record_id = await database.execute(query, name="create_post")
+    response_cache.bump("posts")
+    mark_recent_write(response)
+    # 팔로워 타임라인에 넣는 건 응답을 보낸 뒤에
+    background_tasks.add_task(fan_out_posts, current_user.id, [last_record_id])
 
     return {**data, "id": last_record_id}
 
 
+BulkItems = Body(min_length=1, max_length=config.BULK_MAX_BATCH_SIZE)
+
+
+async def find_missing_posts(post_ids: set[int]) -> set[int]:
+    """게시글이 있는지 하나씩 대신 IN 쿼리 한 번으로"""
+    query = sqlalchemy.select(post_table.c.id).where(post_table.c.id.in_(post_ids))
+    found = await database.fetch_all(query, name="find_posts")
+
+    return post_ids - {row.id for row in found}
+
+
+async def raise_for_missing_posts(post_ids: set[int]) -> None:
+    if missing := await find_missing_posts(post_ids):
+        logger.error(f"Posts with ids {sorted(missing)} not found")
+        raise HTTPException(
+            status_code=404, detail=f"Posts not found: {sorted(missing)}"
+        )
+
+
+async def insert_many(table: sqlalchemy.Table, rows: list[dict], name: str) -> list:
+    """여러 행을 INSERT ... VALUES (...), (...) RETURNING 한 번으로
+
+    한 문장 안에서는 id가 입력 순서대로 매겨지므로 id 순으로 정렬해서 돌려줌
+    """
+    query = table.insert().values(rows).returning(*table.c)
+    created = await database.fetch_all(query, name=name)
+
+    return sorted(created, key=lambda row: row.id)
+
+
+@router.post("/bulk", response_model=list[UserPost], status_code=201)
+async def create_posts(
+    posts: Annotated[list[UserPostIn], BulkItems],
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+    background_tasks: BackgroundTasks,
+):
+    logger.info(f"Creating {len(posts)} posts")
+
+    rows = [
+        {**dict(post), "user_id": current_user.id, "fanned_out": False}
+        for post in posts
+    ]
+    async with database.transaction():
+        created = await insert_many(post_table, rows, name="create_posts")
+
+    response_cache.bump("posts")
+    mark_recent_write(response)
+    background_tasks.add_task(
+        fan_out_posts, current_user.id, [post.id for post in created]
+    )
+
+    return created
+
+
 class PostSorting(str, Enum):
     new = "new"
     old = "old"
     most_likes = "most_likes"
 
 
-@router.get("", response_model=list[UserPostWithLikes])
-async def get_all_posts(sorting: PostSorting = PostSorting.new):
+def sorted_posts(sorting: PostSorting) -> sqlalchemy.Select:
+    if sorting == PostSorting.old:
+        return select_post_and_likes.order_by(post_table.c.id.asc())
+    if sorting == PostSorting.most_likes:
+        return select_post_and_likes.order_by(
+            post_table.c.like_count.desc(), post_table.c.id.desc()
+        )
+
+    return select_post_and_likes.order_by(post_table.c.id.desc())
+
+
+@router.get("", response_model=UserPostPage)
+async def get_all_posts(
+    request: Request,
+    read_db: Annotated[Database, Depends(get_read_database)],
+    sorting: PostSorting = PostSorting.new,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
     logger.info("Getting all posts")  # 데코레이터로 요런 걸 직접 만들수도
 
-    """
-    match sorting:
-        case PostSorting.new:
-            query = select_post_and_likes.order_by(post_table.c.id.desc())
-    """
+    # 모두에게 같은 응답이라 캐시, 글이 생기거나 좋아요가 바뀌면 무효화
+    return await response_cache.respond(
+        request,
+        ["posts"],
+        serialize_posts_page,
+        lambda: fetch_posts_page(read_db, sorting, limit, cursor),
+    )
+
+
+async def fetch_posts_page(
+    read_db: Database, sorting: PostSorting, limit: int, cursor: str | None
+) -> dict:
+    # OFFSET 대신 마지막으로 본 (likes, id) 다음부터 읽기
+    position = decode_cursor(cursor, "likes", "id") if cursor else None
+
+    query = sorted_posts(sorting)
+    if position and sorting == PostSorting.new:
+        query = query.where(post_table.c.id < position["id"])
+    elif position and sorting == PostSorting.old:
+        query = query.where(post_table.c.id > position["id"])
+    elif position and sorting == PostSorting.most_likes:
+        query = query.where(
+            sqlalchemy.tuple_(post_table.c.like_count, post_table.c.id)
+            < (position["likes"], position["id"])
+        )
+
+    # 다음 페이지가 있는지 알기 위해 하나 더 읽기
+    query = query.limit(limit + 1)
+
+    posts = await read_db.fetch_all(query, name="get_all_posts")
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(likes=posts[-1].likes, id=posts[-1].id)
+
+    return {"posts": with_pending_likes(posts), "next_cursor": next_cursor}
+
+
+async def ndjson_lines(
+    read_db: Database, query: sqlalchemy.Select, name: str
+) -> AsyncIterator[bytes]:
+    columns = [str(key) for key in query.selected_columns.keys()]
+    # fetch_all처럼 전부 메모리에 올리지 않고 한 행씩 (postgres는 서버 측 커서)
+    async for row in read_db.iterate(query, name=name):
+        yield orjson.dumps({column: row[column] for column in columns}) + b"\n"
+
+
+@router.get("/search", response_model=UserPostPage)
+async def search_posts(
+    read_db: Annotated[Database, Depends(get_read_database)],
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    """본문이나 댓글에 q의 단어가 모두 들어 있는 게시글을 관련도 순으로"""
+    logger.info("Searching posts")
+
+    if not has_terms(q):
+        return {"posts": [], "next_cursor": None}
+
+    # LIKE '%q%'는 전체를 훑으니 전문 검색 인덱스로 (database.fts5_ddl 참고)
+    scores = search_scores(q)
+    query = (
+        select_post_and_likes.add_columns(scores.c.score)
+        .join(scores, scores.c.post_id == post_table.c.id)
+        .order_by(scores.c.score.desc(), post_table.c.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        position = decode_cursor(cursor, "score", "id")
+        query = query.where(
+            sqlalchemy.tuple_(scores.c.score, post_table.c.id)
+            < (position["score"], position["id"])
+        )
+
+    posts = await read_db.fetch_all(query, name="search_posts")
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(score=posts[-1].score, id=posts[-1].id)
+
+    return {"posts": with_pending_likes(posts), "next_cursor": next_cursor}
+
+
+# /{post_id}보다 먼저 등록해야 "export"가 post_id로 잡히지 않음
+@router.get("/export", response_class=StreamingResponse)
+async def export_posts(
+    read_db: Annotated[Database, Depends(get_read_database)],
+    sorting: PostSorting = PostSorting.new,
+):
+    logger.info("Exporting posts")
 
-    if sorting == PostSorting.new:
-        query = select_post_and_likes.order_by(post_table.c.id.desc())
-    elif sorting == PostSorting.old:
-        query = select_post_and_likes.order_by(post_table.c.id.asc())
-    elif sorting == PostSorting.most_likes:
-        query = select_post_and_likes.order_by(sqlalchemy.desc("likes"))
+    return StreamingResponse(
+        ndjson_lines(read_db, sorted_posts(sorting), name="export_posts"),
+        media_type="application/x-ndjson",
+    )
 
-    logger.debug(query)
 
-    return await database.fetch_all(query)
+def serialize_posts_page(page: dict) -> bytes:
+    """피드는 행이 많아서 행마다 UserPostWithLikes로 검증하지 않고 바로 orjson으로
+
+    select_post_and_likes의 컬럼이 UserPostWithLikes와 같은지는 테스트에서 확인
+    """
+    return orjson.dumps(
+        {
+            "posts": [
+                {column: post[column] for column in post_and_likes_columns}
+                for post in page["posts"]
+            ],
+            "next_cursor": page["next_cursor"],
+        }
+    )
+
+
+async def add_comment_counts(deltas: Counter[int]) -> None:
+    """게시글마다 UPDATE하지 않고 CASE로 한 번에 (like_buffer와 같은 방식)"""
+    query = (
+        post_table.update()
+        .where(post_table.c.id.in_(deltas))
+        .values(
+            comment_count=post_table.c.comment_count
+            + sqlalchemy.case(deltas, value=post_table.c.id)
+        )
+    )
+    await database.execute(query, name="update_comment_counts")
 
 
 @router.post("/comments", response_model=Comment, status_code=201)
 async def create_comment(
     comment: CommentIn,
     current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
 ):
     logger.info("Creating comment")
 
-    post = await find_post(comment.post_id)
-    if not post:
+    data = {**dict(comment), "user_id": current_user.id}
+    query = insert_if_post_exists(comment_table, data)
+
+    # 댓글 행과 카운터가 어긋나지 않도록 한 트랜잭션으로
+    async with database.transaction():
+        last_record_id = await database.fetch_val(query, name="create_comment")
+        if last_record_id is not None:
+            await add_comment_counts(Counter([comment.post_id]))
+
+    if last_record_id is None:
         logger.error(f"Post with id {comment.post_id} not found")
         raise HTTPException(status_code=404, detail="Post not found")
+    # 목록에도 댓글 수가 나오므로 "posts"까지
+    response_cache.bump("posts", ("post", comment.post_id))
+    mark_recent_write(response)
 
-    data = {**dict(comment), "user_id": current_user.id}
-    query = comment_table.insert().values(data)
+    return {**data, "id": last_record_id}
+
+
+@router.post("/comments/bulk", response_model=list[Comment], status_code=201)
+async def create_comments(
+    comments: Annotated[list[CommentIn], BulkItems],
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+):
+    logger.info(f"Creating {len(comments)} comments")
 
-    logger.debug(query)
+    post_ids = {comment.post_id for comment in comments}
+    rows = [{**dict(comment), "user_id": current_user.id} for comment in comments]
 
-    last_record_id = await database.execute(query)
+    async with database.transaction():
+        await raise_for_missing_posts(post_ids)
+        created = await insert_many(comment_table, rows, name="create_comments")
+        await add_comment_counts(Counter(comment.post_id for comment in comments))
 
-    return {**data, "id": last_record_id}
+    response_cache.bump("posts", *(("post", post_id) for post_id in post_ids))
+    mark_recent_write(response)
+
+    return created
 
 
-@router.get("/{post_id}/comments", response_model=list[Comment])
-async def get_comments_on_post(post_id: int):
+@router.get("/{post_id}/comments/export", response_class=StreamingResponse)
+async def export_comments_on_post(
+    post_id: int, read_db: Annotated[Database, Depends(get_read_database)]
+):
+    logger.info("Exporting comments on post")
+    query = (
+        comment_table.select()
+        .where(comment_table.c.post_id == post_id)
+        .order_by(comment_table.c.id)
+    )
+
+    return StreamingResponse(
+        ndjson_lines(read_db, query, name="export_comments_on_post"),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/{post_id}/comments", response_model=CommentPage)
+async def get_comments_on_post(
+    post_id: int,
+    read_db: Annotated[Database, Depends(get_read_database)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
     logger.info("Getting comments on post")
-    query = comment_table.select().where(comment_table.c.post_id == post_id)
-    logger.debug(query)
 
-    return await database.fetch_all(query)
+    # ix_comments_post_id_id를 따라 커서 다음부터 limit + 1개만
+    query = (
+        comment_table.select()
+        .where(comment_table.c.post_id == post_id)
+        .order_by(comment_table.c.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        query = query.where(comment_table.c.id > decode_cursor(cursor, "id")["id"])
+
+    comments = await read_db.fetch_all(query, name="get_comments_on_post")
+
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(id=comments[-1].id)
+
+    return {"comments": comments, "next_cursor": next_cursor}
+
+
+def comments_as_json(comments: sqlalchemy.Subquery) -> sqlalchemy.ScalarSelect:
+    """댓글 페이지를 JSON 배열 하나로 묶어서 게시글 행에 같이 실어 보내기"""
+    fields = []
+    for column in comments.c:
+        # json_build_object는 바인딩 파라미터 타입을 추론하지 못해서 리터럴로
+        fields += [sqlalchemy.literal_column(f"'{column.name}'"), column]
+
+    if "postgres" in config.DATABASE_URL:
+        aggregated = sqlalchemy.func.coalesce(
+            sqlalchemy.func.json_agg(sqlalchemy.func.json_build_object(*fields)),
+            sqlalchemy.literal_column("'[]'::json"),
+        )
+    else:
+        # 행이 없으면 '[]'
+        aggregated = sqlalchemy.func.json_group_array(
+            sqlalchemy.func.json_object(*fields)
+        )
+
+    return sqlalchemy.select(aggregated).select_from(comments).scalar_subquery()
 
 
 @router.get("/{post_id}", response_model=UserPostWithComments)
-async def get_post_width_comments(post_id: int):
+async def get_post_width_comments(
+    post_id: int,
+    request: Request,
+    read_db: Annotated[Database, Depends(get_read_database)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
     logger.info("Getting post and its comments")
 
-    query = select_post_and_likes.where(post_table.c.id == post_id)
-    logger.debug(query)
-
-    post = await database.fetch_one(query)
+    return await response_cache.respond(
+        request,
+        [("post", post_id)],
+        validated(UserPostWithComments),
+        lambda: fetch_post_with_comments(read_db, post_id, limit, cursor),
+    )
+
+
+async def fetch_post_with_comments(
+    read_db: Database, post_id: int, limit: int, cursor: str | None
+) -> dict:
+
+    comments = (
+        comment_table.select()
+        .where(comment_table.c.post_id == post_id)
+        .order_by(comment_table.c.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        comments = comments.where(
+            comment_table.c.id > decode_cursor(cursor, "id")["id"]
+        )
+
+    # App Join 대신 댓글까지 한 번의 쿼리로
+    query = select_post_and_likes.add_columns(
+        comments_as_json(comments.subquery()).label("comments")
+    ).where(post_table.c.id == post_id)
+
+    post = await read_db.fetch_one(query, name="get_post_width_comments")
     if not post:
         logger.error(f"Post with post id {post_id} not found")
         raise HTTPException(status_code=404, detail="Post not found")
 
-    # App Join?
+    comments = post.comments
+    if isinstance(comments, str):
+        comments = json.loads(comments)
+    # json 집계 함수는 순서를 보장하지 않음
+    comments.sort(key=lambda comment: comment["id"])
+
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(id=comments[-1]["id"])
+
     return {
-        "post": post,
-        "comments": await get_comments_on_post(post_id),
+        "post": with_pending_likes([post])[0],
+        "comments": comments,
+        "next_cursor": next_cursor,
+    }
+
+
+@router.post("/lookup", response_model=PostLookup)
+async def lookup_posts(
+    read_db: Annotated[Database, Depends(get_read_database)],
+    ids: Annotated[
+        list[int], Body(min_length=1, max_length=config.POST_LOOKUP_MAX_IDS)
+    ],
+    comments: Annotated[int, Body(ge=0, le=MAX_PAGE_SIZE)] = 0,
+):
+    """여러 게시글을 한 번에 (알림, 북마크 목록), 요청한 순서대로
+
+    GET /posts/{id}를 id마다 부르는 대신 게시글 IN 쿼리 하나 + 댓글 IN 쿼리 하나.
+    없는 게시글은 빠지고, 게시글마다 댓글은 앞에서부터 comments개까지
+    """
+    logger.info(f"Looking up {len(ids)} posts")
+
+    # 중복은 처음 나온 자리에 한 번만
+    ids = list(dict.fromkeys(ids))
+
+    query = select_post_and_likes.where(post_table.c.id.in_(ids))
+    posts = {
+        post["id"]: post
+        for post in with_pending_likes(
+            await read_db.fetch_all(query, name="lookup_posts")
+        )
     }
 
+    comments_by_post: dict[int, list] = {post_id: [] for post_id in posts}
+    if comments and posts:
+        for comment in await read_db.fetch_all(
+            first_comments(list(posts), comments + 1), name="lookup_comments"
+        ):
+            comments_by_post[comment.post_id].append(comment)
+
+    results = []
+    for post_id in ids:
+        if post_id not in posts:
+            continue
+
+        page = comments_by_post[post_id]
+        next_cursor = None
+        if len(page) > comments:
+            page = page[:comments]
+            next_cursor = encode_cursor(id=page[-1].id)
+
+        results.append(
+            {"post": posts[post_id], "comments": page, "next_cursor": next_cursor}
+        )
 
-@router.post("/like", response_model=PostLike, status_code=201)
+    return {"posts": results}
+
+
+def first_comments(post_ids: list[int], limit: int) -> sqlalchemy.Select:
+    """게시글마다 id 순으로 앞의 limit개 댓글 (ROW_NUMBER 윈도 함수)
+
+    ix_comments_post_id_id 순서대로 번호를 매기지만, 번호를 매기려면 게시글의
+    댓글을 다 읽으므로 댓글이 아주 많은 게시글이 섞이면 그만큼 느려짐
+    """
+    position = (
+        sqlalchemy.func.row_number()
+        .over(partition_by=comment_table.c.post_id, order_by=comment_table.c.id)
+        .label("position")
+    )
+    ranked = (
+        sqlalchemy.select(*comment_table.c, position)
+        .where(comment_table.c.post_id.in_(post_ids))
+        .subquery()
+    )
+
+    return (
+        sqlalchemy.select(*(ranked.c[column.name] for column in comment_table.c))
+        .where(ranked.c.position <= limit)
+        .order_by(ranked.c.post_id, ranked.c.id)
+    )
+
+
+@router.post("/like", response_model=PostLikeState)
 async def like_post(
-    like: PostLikeIn, current_user: Annotated[User, Depends(get_current_user)]
+    like: PostLikeIn,
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
 ):
+    """여러 번 눌러도(재시도, 더블클릭) 좋아요는 하나, 현재 상태와 개수를 돌려줌"""
     logger.info("Liking post")
 
-    post = await find_post(like.post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    if like_buffer.enabled:
+        return await buffer_like(like.post_id, current_user.id, response)
 
     data = {**dict(like), "user_id": current_user.id}
-    query = like_table.insert().values(data)
+    query = insert_if_post_exists(like_table, data).on_conflict_do_nothing(
+        index_elements=like_key
+    )
 
-    logger.debug(query)
-    last_record_id = await database.execute(query)
+    # like 행과 카운터가 어긋나지 않도록 한 트랜잭션으로
+    async with database.transaction():
+        liked_id = await database.fetch_val(query, name="like_post")
+        likes = await like_count_after(like.post_id, 1 if liked_id else 0)
 
-    return {**data, "id": last_record_id}
+    if likes is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    if liked_id:
+        response_cache.bump("posts", ("post", like.post_id))
+        mark_recent_write(response)
+
+    likes += like_buffer.pending(like.post_id)
+    return {"post_id": like.post_id, "liked": True, "likes": likes}
+
+
+async def buffer_like(post_id: int, user_id: int, response: Response) -> dict:
+    """INSERT 대신 like_buffer에 쌓기, 게시글/기존 좋아요 확인은 SELECT 한 번"""
+    liked = (
+        sqlalchemy.select(like_table.c.id)
+        .where(like_table.c.post_id == post_id, like_table.c.user_id == user_id)
+        .exists()
+    )
+    query = sqlalchemy.select(post_table.c.like_count, liked.label("liked")).where(
+        post_table.c.id == post_id
+    )
+
+    post = await database.fetch_one(query, name="get_like_state")
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    if not post.liked and await like_buffer.add(post_id, user_id):
+        mark_recent_write(response)
+
+    likes = post.like_count + like_buffer.pending(post_id)
+    return {"post_id": post_id, "liked": True, "likes": likes}
+
+
+@router.post("/unlike", response_model=PostLikeState)
+async def unlike_post(
+    like: PostLikeIn,
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+):
+    logger.info("Unliking post")
+
+    # flush 중인 좋아요는 끝날 때까지 기다린 뒤에 확인
+    # (실패하면 다시 pending으로 돌아오니 discard보다 먼저)
+    await like_buffer.settle(like.post_id, current_user.id)
+
+    if like_buffer.discard(like.post_id, current_user.id):
+        # 아직 쓰지 않은 좋아요였으면 DB는 그대로
+        likes = await like_count_after(like.post_id, 0)
+        likes += like_buffer.pending(like.post_id)
+        return {"post_id": like.post_id, "liked": False, "likes": likes}
+
+    query = (
+        like_table.delete()
+        .where(
+            like_table.c.post_id == like.post_id,
+            like_table.c.user_id == current_user.id,
+        )
+        .returning(like_table.c.id)
+    )
+
+    async with database.transaction():
+        unliked_id = await database.fetch_val(query, name="unlike_post")
+        likes = await like_count_after(like.post_id, -1 if unliked_id else 0)
+
+    if likes is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    if unliked_id:
+        response_cache.bump("posts", ("post", like.post_id))
+        mark_recent_write(response)
+
+    likes += like_buffer.pending(like.post_id)
+    return {"post_id": like.post_id, "liked": False, "likes": likes}
+
+
+@router.post("/like/bulk", response_model=list[PostLike], status_code=201)
+async def like_posts(
+    likes: Annotated[list[PostLikeIn], BulkItems],
+    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+):
+    logger.info(f"Liking {len(likes)} posts")
+
+    # 한 사용자의 좋아요라서 게시글마다 하나씩만
+    post_ids = {like.post_id for like in likes}
+    rows = [{"post_id": post_id, "user_id": current_user.id} for post_id in post_ids]
+    query = (
+        dialect_insert(like_table)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=like_key)
+        .returning(*like_table.c)
+    )
+
+    async with database.transaction():
+        await raise_for_missing_posts(post_ids)
+        # 이미 좋아요한 게시글은 건너뛰고 새로 생긴 것만 돌려받음
+        created = await database.fetch_all(query, name="like_posts")
+        liked_post_ids = {like.post_id for like in created}
+        if liked_post_ids:
+            count_query = (
+                post_table.update()
+                .where(post_table.c.id.in_(liked_post_ids))
+                .values(like_count=post_table.c.like_count + 1)
+            )
+            await database.execute(count_query, name="increment_like_counts")
+
+    if liked_post_ids:
+        response_cache.bump("posts", *(("post", post_id) for post_id in liked_post_ids))
+        mark_recent_write(response)
+
+    return sorted(created, key=lambda like: like.id)
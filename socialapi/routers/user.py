@@ -1,17 +1,34 @@
 import logging
+from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
+import sqlalchemy
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
 from socialapi import tasks
-from socialapi.database import database, user_table
+from socialapi.database import Database, database, post_table, user_table
+from socialapi.models.post import UserPostPage
 from socialapi.models.user import UserIn
+from socialapi.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+from socialapi.replication import get_read_database
+from socialapi.response_cache import response_cache
+from socialapi.routers.post import (
+    select_post_and_likes,
+    serialize_posts_page,
+    with_pending_likes,
+)
 from socialapi.security import (
     authenticate_user,
     create_access_token,
     create_confirmation_token,
-    get_password_hash,
+    get_password_hash_async,
     get_subject_for_token_type,
     get_user,
+    invalidate_user,
 )
 
 logger = logging.getLogger(__name__)
@@ -19,21 +36,19 @@ router = APIRouter()
 
 
 @router.post("/register", status_code=201)
-async def register(user: UserIn, background_tasks: BackgroundTasks, request: Request):
-    if await get_user(user.email):
+async def register(user: UserIn, request: Request):
+    if await get_user(user.email, db=database):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with that email already exists",
         )
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     query = user_table.insert().values(email=user.email, password=hashed_password)
 
-    logger.debug(query)
-    await database.execute(query)
+    await database.execute(query, name="register")
 
-    background_tasks.add_task(
-        tasks.send_user_registration_email,
+    await tasks.registration_batcher.add(
         user.email,
         confirmation_url=request.url_for(
             "confirm_email", token=create_confirmation_token(user.email)
@@ -60,7 +75,59 @@ async def confirm_email(token: str):
         user_table.update().where(user_table.c.email == email).values(confirmed=True)
     )
 
-    logger.debug(query)
-    await database.execute(query)
+    await database.execute(query, name="confirm_email")
+    invalidate_user(email)
 
     return {"detail": "User confirmed"}
+
+
+@router.get("/users/{user_id}/posts", response_model=UserPostPage)
+async def get_user_posts(
+    user_id: int,
+    request: Request,
+    read_db: Annotated[Database, Depends(get_read_database)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    """사용자가 쓴 글을 최신 순으로, GET /posts를 받아서 거르지 않아도 되게"""
+    logger.info(f"Getting posts of user {user_id}")
+
+    # 글이 생기거나 좋아요가 바뀌면 GET /posts와 같이 무효화
+    return await response_cache.respond(
+        request,
+        ["posts"],
+        serialize_posts_page,
+        lambda: fetch_user_posts_page(read_db, user_id, limit, cursor),
+    )
+
+
+async def fetch_user_posts_page(
+    read_db: Database, user_id: int, limit: int, cursor: str | None
+) -> dict:
+    # ix_posts_user_id_id를 따라 커서 다음부터 limit + 1개만 읽음 (테이블 크기와 무관)
+    query = (
+        select_post_and_likes.where(post_table.c.user_id == user_id)
+        .order_by(post_table.c.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        position = decode_cursor(cursor, "id")
+        query = query.where(post_table.c.id < position["id"])
+
+    posts = await read_db.fetch_all(query, name="get_user_posts")
+
+    # 빈 목록이 글이 없는 사용자인지 없는 사용자인지는 이때만 확인
+    if not posts and not cursor and not await user_exists(read_db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(id=posts[-1].id)
+
+    return {"posts": with_pending_likes(posts), "next_cursor": next_cursor}
+
+
+async def user_exists(read_db: Database, user_id: int) -> bool:
+    query = sqlalchemy.select(user_table.c.id).where(user_table.c.id == user_id)
+    return await read_db.fetch_val(query, name="user_exists") is not None
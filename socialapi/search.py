@@ -0,0 +1,79 @@
+import re
+
+import sqlalchemy
+
+from socialapi.config import config
+from socialapi.database import comment_table, post_table
+
+# 게시글 본문에서 찾은 것보다 댓글에서 찾은 것을 낮게
+COMMENT_WEIGHT = 0.5
+
+ENGLISH = sqlalchemy.literal_column("'english'")
+
+# (테이블, 게시글 id 컬럼, 가중치)
+sources = [
+    (post_table, post_table.c.id, 1),
+    (comment_table, comment_table.c.post_id, COMMENT_WEIGHT),
+]
+
+
+def has_terms(q: str) -> bool:
+    return bool(re.search(r"\w", q))
+
+
+def fts5_query(q: str) -> str:
+    """사용자 입력을 FTS5 문법으로 (단어마다 따옴표, 모두 포함 = AND)
+
+    그대로 MATCH에 넘기면 AND, NEAR, " 같은 문자가 문법으로 해석되어 오류가 남
+    """
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", q))
+
+
+def document(table: sqlalchemy.Table) -> sqlalchemy.ColumnElement:
+    # database.tsvector_index_ddl의 인덱스 식과 같아야 인덱스를 탐
+    return sqlalchemy.func.to_tsvector(
+        ENGLISH,
+        sqlalchemy.func.coalesce(table.c.body, sqlalchemy.literal_column("''")),
+    )
+
+
+def sqlite_hits(
+    table: sqlalchemy.Table, post_id: sqlalchemy.Column, weight: float, q: str
+) -> sqlalchemy.Select:
+    fts = sqlalchemy.table(f"{table.name}_fts", sqlalchemy.column("rowid"))
+    fts_column = sqlalchemy.literal_column(fts.name)
+    # bm25는 작을수록 잘 맞음
+    score = -sqlalchemy.func.bm25(fts_column) * weight
+
+    return (
+        sqlalchemy.select(post_id.label("post_id"), score.label("score"))
+        .select_from(fts.join(table, table.c.id == fts.c.rowid))
+        .where(fts_column.op("MATCH")(fts5_query(q)))
+    )
+
+
+def postgres_hits(
+    table: sqlalchemy.Table, post_id: sqlalchemy.Column, weight: float, q: str
+) -> sqlalchemy.Select:
+    tsquery = sqlalchemy.func.plainto_tsquery(ENGLISH, q)
+    score = sqlalchemy.func.ts_rank(document(table), tsquery) * weight
+
+    return sqlalchemy.select(post_id.label("post_id"), score.label("score")).where(
+        document(table).op("@@")(tsquery)
+    )
+
+
+def search_scores(q: str) -> sqlalchemy.Subquery:
+    """q가 본문이나 댓글에 들어 있는 게시글마다 (post_id, score), 높을수록 관련도가 높음"""
+    hits = postgres_hits if "postgres" in config.DATABASE_URL else sqlite_hits
+
+    union = sqlalchemy.union_all(
+        *(hits(table, post_id, weight, q) for table, post_id, weight in sources)
+    ).subquery()
+    return (
+        sqlalchemy.select(
+            union.c.post_id, sqlalchemy.func.max(union.c.score).label("score")
+        )
+        .group_by(union.c.post_id)
+        .subquery()
+    )
@@ -1,20 +1,28 @@
+import asyncio
 import datetime
 import logging
-from typing import Annotated, Literal
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Annotated, Callable, Literal, TypeVar
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 
-from socialapi.database import database, user_table
+from socialapi.cache import CacheStore, TTLCache
+from socialapi.config import config
+from socialapi.database import Database, database, read_database, user_table
 
 logger = logging.getLogger(__name__)
 
 SECRET_KEY = "secret-key"
 ALGORITHM = "HS256"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-pwd_context = CryptContext(schemes=["bcrypt"])
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=config.BCRYPT_ROUNDS)
+
+T = TypeVar("T")
 
 
 def create_credentials_exception(detail: str) -> HTTPException:
@@ -59,15 +67,50 @@ def create_confirmation_token(email: str):
     return encoded_jwt
 
 
+# token -> {"sub", "type", "exp"}, 토큰이 만료되면 캐시에서도 만료
+token_cache: CacheStore = TTLCache(
+    maxsize=config.TOKEN_CACHE_MAX_SIZE, ttl=access_token_expire_minutes() * 60
+)
+
+
+def decode_token(token: str) -> dict:
+    if config.JWT_BACKEND == "pyjwt":
+        return decode_token_with_pyjwt(token)
+
+    return jwt.decode(token, key=SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def decode_token_with_pyjwt(token: str) -> dict:
+    """python-jose보다 빠른 PyJWT로 디코딩 (pip install pyjwt)
+
+    호출하는 쪽이 그대로 쓸 수 있게 예외는 jose 예외로 바꿔서 던진다.
+    """
+    import jwt as pyjwt
+
+    try:
+        return pyjwt.decode(token, key=SECRET_KEY, algorithms=[ALGORITHM])
+    except pyjwt.ExpiredSignatureError as e:
+        raise ExpiredSignatureError(str(e)) from e
+    except pyjwt.InvalidTokenError as e:
+        raise JWTError(str(e)) from e
+
+
 def get_subject_for_token_type(
     token: str, type: Literal["access", "confirmation"]  # 문자열 타이핑도 되네?
 ) -> str:
-    try:
-        payload = jwt.decode(token, key=SECRET_KEY, algorithms=[ALGORITHM])
-    except ExpiredSignatureError as e:
-        raise create_credentials_exception("Token has expired") from e
-    except JWTError as e:
-        raise create_credentials_exception("Invalid token") from e
+    # 같은 토큰이 만료될 때까지 계속 들어오니 서명 검증은 한 번만
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = decode_token(token)
+        except ExpiredSignatureError as e:
+            raise create_credentials_exception("Token has expired") from e
+        except JWTError as e:
+            raise create_credentials_exception("Invalid token") from e
+
+        if isinstance(payload.get("exp"), (int, float)):
+            payload = {key: payload.get(key) for key in ("sub", "type", "exp")}
+            token_cache.set(token, payload, ttl=payload["exp"] - time.time())
 
     email = payload.get("sub")  # 오우 스코프가 유지되나보네?
     if email is None:
@@ -90,23 +133,134 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-async def get_user(email: str):
+@dataclass
+class PasswordHasherStats:
+    in_flight: int = 0
+    waiting: int = 0  # 워커가 비기를 기다리는 요청 수 (queue depth)
+    max_waiting: int = 0
+    completed: int = 0
+
+
+class PasswordHasher:
+    """bcrypt는 한 번에 수십~수백 ms 걸려서 이벤트 루프를 막지 않게 executor에서"""
+
+    def __init__(self, executor: Literal["thread", "process"], max_workers: int):
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.stats = PasswordHasherStats()
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = (
+                ProcessPoolExecutor
+                if self.executor_type == "process"
+                else ThreadPoolExecutor
+            )
+            self._executor = executor_class(max_workers=self.max_workers)
+
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self._semaphore.locked():
+            self.stats.waiting += 1
+            self.stats.max_waiting = max(self.stats.max_waiting, self.stats.waiting)
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.stats.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.stats.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.stats.in_flight -= 1
+            self.stats.completed += 1
+            self._semaphore.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    config.PASSWORD_HASH_EXECUTOR, config.PASSWORD_HASH_WORKERS
+)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+# 인증이 필요한 요청마다 users를 SELECT하지 않도록
+user_cache: CacheStore = TTLCache(
+    maxsize=config.USER_CACHE_MAX_SIZE, ttl=config.USER_CACHE_TTL_SECONDS
+)
+
+
+def cache_user(user) -> None:
+    user_cache.set(("email", user.email), user)
+    user_cache.set(("id", user.id), user)
+
+
+def invalidate_user(email: str) -> None:
+    """사용자 정보(확인 여부, 비밀번호 등)가 바뀌면 반드시 호출"""
+    user = user_cache.get(("email", email))
+    if user is not None:
+        user_cache.delete(("id", user.id))
+    user_cache.delete(("email", email))
+
+
+async def get_user(email: str, db: Database | None = None):
+    """기본은 replica에서 읽기, 바로 전에 바뀐 값이 필요하면 db=database
+
+    db를 주면 캐시도 건너뛰고 읽은 값으로 캐시를 새로 채움
+    """
+    if db is None and (user := user_cache.get(("email", email))):
+        return user
+
     logger.debug("Fetching user from the database", extra={"email": email})
 
     query = user_table.select().where(user_table.c.email == email)
-    result = await database.fetch_one(query)
+    result = await (db or read_database()).fetch_one(query, name="get_user")
 
     if result:
+        cache_user(result)
+        return result
+
+
+async def get_user_by_id(user_id: int):
+    if user := user_cache.get(("id", user_id)):
+        return user
+
+    logger.debug(f"Fetching user {user_id} from the database")
+
+    query = user_table.select().where(user_table.c.id == user_id)
+    result = await database.fetch_one(query, name="get_user_by_id")
+
+    if result:
+        cache_user(result)
         return result
 
 
 async def authenticate_user(email: str, password: str):
     logger.debug("Authenticating user", extra={"email": email})
 
-    user = await get_user(email)
+    # 가입 확인 직후 로그인하면 replica에는 아직 confirmed가 반영 안 됐을 수 있음
+    user = await get_user(email, db=database)
     if not user:
         raise create_credentials_exception("Invalid email or password")
-    if not verify_password(password, user.password):
+    if not await verify_password_async(password, user.password):
         raise create_credentials_exception("Invalid email or password")
     if not user.confirmed:
         raise create_credentials_exception("User has not confirmed email")
@@ -1,4 +1,7 @@
+import asyncio
+import json
 import logging
+from typing import Any, Awaitable, Callable
 
 import httpx
 
@@ -11,38 +14,308 @@ class APIResponseError(Exception):
     pass
 
 
+class APIClientError(Exception):
+    """4xx, 잘못된 주소처럼 다시 보내도 실패하는 요청이라 재시도하지 않음"""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def api_error(err: httpx.HTTPStatusError) -> Exception:
+    status_code = err.response.status_code
+    message = f"API request failed with status code {status_code}"
+    # 429(rate limit)는 기다렸다 다시 보내면 됨
+    if 400 <= status_code < 500 and status_code != 429:
+        return APIClientError(message, status_code)
+
+    return APIResponseError(message)
+
+
+# 메일마다 TCP/TLS 핸드셰이크를 새로 하지 않도록 lifespan 동안 하나의 클라이언트를 공유
+http_client: httpx.AsyncClient | None = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=config.MAIL_WORKERS * 2,
+            max_keepalive_connections=config.MAIL_WORKERS,
+            keepalive_expiry=30,
+        ),
+        timeout=httpx.Timeout(10),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    if http_client is None:
+        raise RuntimeError("HTTP client is not started, call tasks.startup() first")
+
+    return http_client
+
+
 async def send_simple_email(to: str, subject: str, body: str):
     logger.debug(f"Sending email to '{to[:3]}' with subject '{subject[:20]}'")
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"https://api.mailgun.net/v3/{config.MAILGUN_DOMAIN}/messages",
-                auth=("api", config.MAILGUN_API_KEY),
-                data={
-                    "from": f"verycosy <mailgun@{config.MAILGUN_DOMAIN}>",
-                    "to": [to],
-                    "subject": subject,
-                    "text": body,
-                },
-            )
-            response.raise_for_status()
-            logger.debug(response.content)
+    try:
+        response = await get_http_client().post(
+            f"https://api.mailgun.net/v3/{config.MAILGUN_DOMAIN}/messages",
+            auth=("api", config.MAILGUN_API_KEY),
+            data={
+                "from": f"verycosy <mailgun@{config.MAILGUN_DOMAIN}>",
+                "to": [to],
+                "subject": subject,
+                "text": body,
+            },
+        )
+        response.raise_for_status()
+        logger.debug(response.content)
+
+        return response
+    except httpx.HTTPStatusError as err:
+        raise api_error(err) from err
 
-            return response
-        except httpx.HTTPStatusError as err:
-            raise APIResponseError(
-                f"API request failed with status code {err.response.status_code}"
-            ) from err
 
+async def send_batch_email(recipients: dict[str, dict], subject: str, body: str):
+    """Mailgun batch sending, 한 번의 API 호출로 여러 명에게
 
-async def send_user_registration_email(email: str, confirmation_url: str):
-    return await send_simple_email(
-        email,
+    body의 %recipient.<key>% 는 수신자마다 recipients[email][key]로 치환된다.
+    """
+    logger.debug(f"Sending batch email to {len(recipients)} recipients")
+
+    try:
+        response = await get_http_client().post(
+            f"https://api.mailgun.net/v3/{config.MAILGUN_DOMAIN}/messages",
+            auth=("api", config.MAILGUN_API_KEY),
+            data={
+                "from": f"verycosy <mailgun@{config.MAILGUN_DOMAIN}>",
+                "to": list(recipients),
+                "subject": subject,
+                "text": body,
+                # 없으면 수신자 전원이 to에 서로 노출됨
+                "recipient-variables": json.dumps(recipients),
+            },
+        )
+        response.raise_for_status()
+        logger.debug(response.content)
+
+        return response
+    except httpx.HTTPStatusError as err:
+        raise api_error(err) from err
+
+
+async def send_registration_batch(confirmation_urls: dict[str, str]):
+    return await send_batch_email(
+        {
+            email: {"email": email, "confirmation_url": confirmation_url}
+            for email, confirmation_url in confirmation_urls.items()
+        },
         "Successfully signed up",
         (
-            f"Hi {email}! You have successfully signed up to the Stores REST API."
-            " Please confirm your email by clicking on the"
-            f" following link: {confirmation_url}"
+            "Hi %recipient.email%! You have successfully signed up to the"
+            " Stores REST API. Please confirm your email by clicking on the"
+            " following link: %recipient.confirmation_url%"
         ),
     )
+
+
+async def send_user_registration_emails(confirmation_urls: dict[str, str]):
+    """가입 메일을 한 번에, 묶음이 400으로 거절되면 한 명씩 다시 보내기
+
+    주소 하나 때문에 묶음 전체가 메일을 못 받지 않도록. 한 명씩 보낼 때 거절된 주소는
+    로그만 남기고, 일시적인 오류로 못 보낸 주소만 confirmation_urls에 남겨서
+    예외를 다시 던짐 (MailQueue가 같은 dict로 재시도하니 보낸 사람에게 또 가지 않음)
+    """
+    try:
+        await send_registration_batch(confirmation_urls)
+        return
+    except APIClientError as e:
+        # 401/403/404/413은 주소 문제가 아니라 한 명씩 보내도 똑같이 실패함
+        if e.status_code != 400:
+            raise
+        if len(confirmation_urls) == 1:
+            email = next(iter(confirmation_urls))
+            logger.error(f"Registration email rejected: {e}", extra={"email": email})
+            return
+
+        logger.warning(
+            f"Batch of {len(confirmation_urls)} registration emails rejected ({e}),"
+            " sending one by one"
+        )
+
+    # 묶음이 커도 메일 워커 수만큼만 동시에 요청
+    semaphore = asyncio.Semaphore(config.MAIL_WORKERS)
+
+    async def send_one(email: str):
+        async with semaphore:
+            await send_registration_batch({email: confirmation_urls[email]})
+
+    emails = list(confirmation_urls)
+    results = await asyncio.gather(
+        *(send_one(email) for email in emails), return_exceptions=True
+    )
+
+    retryable = None
+    for email, result in zip(emails, results):
+        if isinstance(result, APIClientError):
+            logger.error(
+                f"Registration email rejected: {result}", extra={"email": email}
+            )
+        elif isinstance(result, Exception):
+            retryable = result
+            continue
+
+        del confirmation_urls[email]
+
+    if retryable is not None:
+        raise retryable
+
+
+Job = tuple[Callable[..., Awaitable[Any]], tuple, dict]
+
+
+class MailQueue:
+    """크기가 정해진 큐 + 워커 N개로 메일 발송 (BackgroundTasks 대신)
+
+    APIResponseError나 네트워크 오류는 지수 백오프로 재시도하고 (4xx는 재시도하지 않음),
+    종료할 때는 남은 메일을 다 보낼 때까지 기다린다.
+    """
+
+    def __init__(
+        self, maxsize: int, workers: int, max_retries: int, retry_backoff: float
+    ):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: asyncio.Queue[Job] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def size(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def enqueue(self, func: Callable[..., Awaitable[Any]], *args, **kwargs):
+        if self._queue is None:
+            raise RuntimeError("Mail queue is not started")
+
+        # 큐가 가득 차면 요청 쪽에서 기다림 (backpressure)
+        await self._queue.put((func, args, kwargs))
+
+    async def stop(self, timeout: float) -> None:
+        if self._queue is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Mail queue did not drain, {self.size} emails dropped")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+
+    async def _work(self) -> None:
+        while True:
+            func, args, kwargs = await self._queue.get()
+            try:
+                await self._run(func, args, kwargs)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, func, args, kwargs) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await func(*args, **kwargs)
+                return
+            except APIClientError as e:
+                logger.error(f"{func.__name__} rejected, not retrying: {e}")
+                return
+            except (APIResponseError, httpx.TransportError) as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Giving up on {func.__name__}: {e}")
+                    return
+
+                delay = self.retry_backoff * 2**attempt
+                logger.warning(f"{func.__name__} failed ({e}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                logger.exception(f"{func.__name__} failed")
+                return
+
+
+mail_queue = MailQueue(
+    maxsize=config.MAIL_QUEUE_MAX_SIZE,
+    workers=config.MAIL_WORKERS,
+    max_retries=config.MAIL_MAX_RETRIES,
+    retry_backoff=config.MAIL_RETRY_BACKOFF_SECONDS,
+)
+
+
+class RegistrationEmailBatcher:
+    """가입 메일을 잠깐(window) 모았다가 Mailgun 한 번 호출로 보내기
+
+    window가 지나거나 max_size만큼 모이면 mail_queue로 넘긴다.
+    """
+
+    def __init__(self, queue: MailQueue, window: float, max_size: int):
+        self.queue = queue
+        self.window = window
+        self.max_size = max_size
+        self._pending: dict[str, str] = {}
+        self._timer: asyncio.Task | None = None
+
+    async def add(self, email: str, confirmation_url: str) -> None:
+        self._pending[email] = str(confirmation_url)
+
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        if not self._pending:
+            return
+
+        confirmation_urls, self._pending = self._pending, {}
+        await self.queue.enqueue(send_user_registration_emails, confirmation_urls)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+
+registration_batcher = RegistrationEmailBatcher(
+    mail_queue,
+    window=config.MAIL_BATCH_WINDOW_SECONDS,
+    # Mailgun은 batch 한 번에 수신자 1000명까지
+    max_size=min(config.MAIL_BATCH_MAX_SIZE, 1000),
+)
+
+
+async def startup() -> None:
+    global http_client
+
+    http_client = create_http_client()
+    await mail_queue.start()
+
+
+async def shutdown() -> None:
+    global http_client
+
+    await registration_batcher.flush()
+    await mail_queue.stop(timeout=config.MAIL_DRAIN_TIMEOUT_SECONDS)
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
@@ -8,8 +8,10 @@ from httpx import AsyncClient, Request, Response
 
 os.environ["ENV_STATE"] = "test"
 
-from socialapi.database import database, user_table  # noqa: E402
+from socialapi import security, tasks  # noqa: E402
+from socialapi.database import database, engine, metadata, user_table  # noqa: E402
 from socialapi.main import app  # noqa: E402
+from socialapi.response_cache import response_cache  # noqa: E402
 
 
 # 모든 테스트에서 한 번만 수행
@@ -23,6 +25,14 @@ def client() -> Generator:
     yield TestClient(app)
 
 
+# 스키마가 바뀌어도 항상 최신 모델로 시작
+@pytest.fixture(scope="session", autouse=True)
+def tables() -> Generator:
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    yield
+
+
 # 매 테스트마다 수행
 @pytest.fixture(autouse=True)
 async def db() -> AsyncGenerator:
@@ -31,6 +41,15 @@ async def db() -> AsyncGenerator:
     await database.disconnect()
 
 
+# 캐시는 롤백되지 않으니 테스트마다 비우기
+@pytest.fixture(autouse=True)
+def clear_caches() -> Generator:
+    yield
+    security.user_cache.clear()
+    security.token_cache.clear()
+    response_cache.clear()
+
+
 # def client의 반환값이 의존성으로 주입됨
 # 변수 이름만으로..이래도 되나..?
 @pytest.fixture()
@@ -59,6 +78,7 @@ async def confirmed_user(registered_user: dict) -> dict:
         user_table.update().where(user_table.c.email == registered_user["email"])
     ).values(confirmed=True)
     await database.execute(query)
+    security.invalidate_user(registered_user["email"])
     return registered_user
 
 
@@ -76,6 +96,15 @@ def mock_httpx_client(mocker):
     mocked_async_client = Mock()
     response = Response(status_code=200, content="", request=Request("POST", "//"))
     mocked_async_client.post = AsyncMock(return_value=response)
-    mocked_client.return_value.__aenter__.return_value = mocked_async_client
+    mocked_async_client.aclose = AsyncMock()
+    mocked_client.return_value = mocked_async_client
 
     return mocked_async_client
+
+
+# lifespan이 돌지 않으니 메일 큐/http 클라이언트도 직접
+@pytest.fixture(autouse=True)
+async def background_tasks(mock_httpx_client) -> AsyncGenerator:
+    await tasks.startup()
+    yield
+    await tasks.shutdown()
@@ -0,0 +1,255 @@
+import pytest
+import sqlalchemy
+from httpx import AsyncClient
+
+from socialapi.config import config
+from socialapi.database import database, timeline_table, user_table
+from socialapi.security import create_access_token
+
+
+async def create_user(email: str) -> dict:
+    user_id = await database.execute(
+        user_table.insert().values(email=email, password="x", confirmed=True)
+    )
+    return {"id": user_id, "email": email, "token": create_access_token(email)}
+
+
+async def create_post(async_client: AsyncClient, token: str, body: str) -> int:
+    response = await async_client.post(
+        "/posts", json={"body": body}, headers={"Authorization": f"Bearer {token}"}
+    )
+    return response.json()["id"]
+
+
+async def follow(async_client: AsyncClient, token: str, user_id: int, action="follow"):
+    return await async_client.post(
+        f"/{action}",
+        json={"user_id": user_id},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+async def get_feed(async_client: AsyncClient, token: str, **params) -> dict:
+    response = await async_client.get(
+        "/feed", params=params, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def timeline(user_id: int) -> list[int]:
+    query = sqlalchemy.select(timeline_table.c.post_id).where(
+        timeline_table.c.user_id == user_id
+    )
+    return [row.post_id for row in await database.fetch_all(query)]
+
+
+def post_ids(feed: dict) -> list[int]:
+    return [post["id"] for post in feed["posts"]]
+
+
+@pytest.fixture()
+async def author() -> dict:
+    return await create_user("author@test.com")
+
+
+@pytest.fixture()
+async def reader() -> dict:
+    return await create_user("reader@test.com")
+
+
+@pytest.mark.anyio
+async def test_follow(async_client: AsyncClient, author: dict, reader: dict):
+    response = await follow(async_client, reader["token"], author["id"])
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_id": author["id"],
+        "following": True,
+        "followers": 1,
+    }
+
+
+@pytest.mark.anyio
+async def test_follow_is_idempotent(
+    async_client: AsyncClient, author: dict, reader: dict
+):
+    await follow(async_client, reader["token"], author["id"])
+    response = await follow(async_client, reader["token"], author["id"])
+
+    assert response.json()["followers"] == 1
+
+
+@pytest.mark.anyio
+async def test_follow_self(async_client: AsyncClient, reader: dict):
+    response = await follow(async_client, reader["token"], reader["id"])
+
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_follow_user_not_found(async_client: AsyncClient, reader: dict):
+    response = await follow(async_client, reader["token"], 999)
+
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_unfollow(async_client: AsyncClient, author: dict, reader: dict):
+    await follow(async_client, reader["token"], author["id"])
+    response = await follow(async_client, reader["token"], author["id"], "unfollow")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_id": author["id"],
+        "following": False,
+        "followers": 0,
+    }
+
+
+@pytest.mark.anyio
+async def test_feed_fans_out_new_posts(
+    async_client: AsyncClient, author: dict, reader: dict
+):
+    stranger = await create_user("stranger@test.com")
+    await follow(async_client, reader["token"], author["id"])
+
+    post_id = await create_post(async_client, author["token"], "Hello followers")
+    await create_post(async_client, stranger["token"], "Not followed")
+
+    feed = await get_feed(async_client, reader["token"])
+
+    assert feed == {
+        "posts": [
+            {
+                "id": post_id,
+                "body": "Hello followers",
+                "user_id": author["id"],
+                "likes": 0,
+                "comment_count": 0,
+            }
+        ],
+        "next_cursor": None,
+    }
+    assert await timeline(reader["id"]) == [post_id]
+
+
+@pytest.mark.anyio
+async def test_feed_backfills_on_follow(
+    async_client: AsyncClient, author: dict, reader: dict
+):
+    post_id = await create_post(async_client, author["token"], "Before follow")
+    await follow(async_client, reader["token"], author["id"])
+
+    assert post_ids(await get_feed(async_client, reader["token"])) == [post_id]
+
+
+@pytest.mark.anyio
+async def test_feed_after_unfollow(
+    async_client: AsyncClient, author: dict, reader: dict
+):
+    await follow(async_client, reader["token"], author["id"])
+    await create_post(async_client, author["token"], "Hello followers")
+    await follow(async_client, reader["token"], author["id"], "unfollow")
+
+    assert post_ids(await get_feed(async_client, reader["token"])) == []
+
+
+@pytest.mark.anyio
+async def test_feed_pagination(async_client: AsyncClient, author: dict, reader: dict):
+    await follow(async_client, reader["token"], author["id"])
+    created = [
+        await create_post(async_client, author["token"], f"Post {i}") for i in range(3)
+    ]
+
+    first = await get_feed(async_client, reader["token"], limit=2)
+    second = await get_feed(
+        async_client, reader["token"], limit=2, cursor=first["next_cursor"]
+    )
+
+    assert post_ids(first) == created[:0:-1]
+    assert post_ids(second) == created[:1]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_feed_celebrity_fan_out_on_read(
+    async_client: AsyncClient, author: dict, reader: dict, mocker
+):
+    other = await create_user("other@test.com")
+    await follow(async_client, reader["token"], author["id"])
+    await follow(async_client, reader["token"], other["id"])
+    fanned_out = await create_post(async_client, author["token"], "Before famous")
+
+    # 팔로워가 한 명만 있어도 celebrity
+    mocker.patch.object(config, "FEED_FAN_OUT_MAX_FOLLOWERS", 1)
+    pulled = await create_post(async_client, author["token"], "Famous now")
+
+    feed = await get_feed(async_client, reader["token"])
+
+    # 새 글은 타임라인에 없지만 읽을 때 가져오고, 양쪽에 있는 글은 한 번만
+    assert await timeline(reader["id"]) == [fanned_out]
+    assert post_ids(feed) == [pulled, fanned_out]
+
+
+@pytest.mark.anyio
+async def test_feed_pulls_latest_posts_per_followee(
+    async_client: AsyncClient, author: dict, reader: dict, mocker
+):
+    other = await create_user("other@test.com")
+    await follow(async_client, reader["token"], author["id"])
+    await follow(async_client, reader["token"], other["id"])
+    mocker.patch.object(config, "FEED_FAN_OUT_MAX_FOLLOWERS", 0)
+    created = []
+    for i in range(3):
+        created.append(await create_post(async_client, author["token"], f"A{i}"))
+        created.append(await create_post(async_client, other["token"], f"O{i}"))
+
+    first = await get_feed(async_client, reader["token"], limit=4)
+    second = await get_feed(
+        async_client, reader["token"], limit=4, cursor=first["next_cursor"]
+    )
+
+    # 사용자마다 limit개씩 읽고 합쳐도 전체 순서와 페이지 경계가 맞아야 함
+    assert await timeline(reader["id"]) == []
+    assert post_ids(first) + post_ids(second) == created[::-1]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_feed_requires_login(async_client: AsyncClient):
+    response = await async_client.get("/feed")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_feed_after_author_drops_below_threshold(
+    async_client: AsyncClient, author: dict, reader: dict, mocker
+):
+    fan = await create_user("fan@test.com")
+    await follow(async_client, reader["token"], author["id"])
+    await follow(async_client, fan["token"], author["id"])
+    mocker.patch.object(config, "FEED_FAN_OUT_MAX_FOLLOWERS", 2)
+    pulled = await create_post(async_client, author["token"], "Famous now")
+
+    # 팔로워가 기준 아래로 내려가도 fan-out 하지 않았던 글은 계속 보임
+    await follow(async_client, fan["token"], author["id"], "unfollow")
+    after = await create_post(async_client, author["token"], "Not famous anymore")
+
+    assert await timeline(reader["id"]) == [after]
+    assert post_ids(await get_feed(async_client, reader["token"])) == [after, pulled]
+
+
+@pytest.mark.anyio
+async def test_feed_fan_out_failure(
+    async_client: AsyncClient, author: dict, reader: dict, mocker
+):
+    await follow(async_client, reader["token"], author["id"])
+    mocker.patch("socialapi.feed.fan_out_query", side_effect=RuntimeError)
+
+    post_id = await create_post(async_client, author["token"], "Hello followers")
+
+    # 타임라인에 못 넣었어도 읽을 때 가져옴
+    assert await timeline(reader["id"]) == []
+    assert post_ids(await get_feed(async_client, reader["token"])) == [post_id]
@@ -1,7 +1,27 @@
+import asyncio
+
+import orjson
 import pytest
 from httpx import AsyncClient
 
 from socialapi import security
+from socialapi.config import config
+from socialapi.database import (
+    Database,
+    comment_table,
+    database,
+    integrity_errors,
+    like_table,
+    read_replicas,
+)
+from socialapi.like_buffer import like_buffer
+from socialapi.models.post import UserPostPage, UserPostWithLikes
+from socialapi.pagination import encode_cursor
+from socialapi.routers.post import (
+    post_and_likes_columns,
+    select_post_and_likes,
+    serialize_posts_page,
+)
 
 # routers에 conftest가 있으면 그것도 적용되는데
 # 없어서 부모 경로에 있는 conftest만.
@@ -99,7 +119,42 @@ async def test_like_post(
         headers={"Authorization": f"Bearer {logged_in_token}"},
     )
 
-    assert response.status_code == 201
+    assert response.status_code == 200
+    assert response.json() == {
+        "post_id": created_post["id"],
+        "liked": True,
+        "likes": 1,
+    }
+
+
+@pytest.mark.anyio
+async def test_like_post_twice(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    await like_post(created_post["id"], async_client, logged_in_token)
+
+    response = await async_client.post(
+        "/posts/like",
+        json={"post_id": created_post["id"]},
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+    post = await async_client.get(f"/posts/{created_post['id']}")
+
+    # 두 번 눌러도 좋아요는 하나
+    assert response.status_code == 200
+    assert response.json()["likes"] == 1
+    assert post.json()["post"]["likes"] == 1
+
+
+@pytest.mark.anyio
+async def test_like_post_updates_like_count(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    await like_post(created_post["id"], async_client, logged_in_token)
+
+    response = await async_client.get(f"/posts/{created_post['id']}")
+
+    assert response.json()["post"]["likes"] == 1
 
 
 @pytest.mark.anyio
@@ -107,7 +162,8 @@ async def test_get_all_posts(async_client: AsyncClient, created_post: dict):
     response = await async_client.get("/posts")
 
     assert response.status_code == 200
-    assert created_post.items() <= response.json()[0].items()
+    assert created_post.items() <= response.json()["posts"][0].items()
+    assert response.json()["next_cursor"] is None
 
 
 @pytest.mark.anyio
@@ -127,7 +183,7 @@ async def test_get_all_posts_sorting(
     assert response.status_code == 200
 
     data = response.json()
-    post_ids = [post["id"] for post in data]
+    post_ids = [post["id"] for post in data["posts"]]
     assert post_ids == expected_order
 
 
@@ -146,11 +202,66 @@ async def test_get_all_posts_sort_likes(
     assert response.status_code == 200
 
     data = response.json()
-    post_ids = [post["id"] for post in data]
+    post_ids = [post["id"] for post in data["posts"]]
     expected_order = [1, 2]
     assert post_ids == expected_order
 
 
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "sorting, expected_pages",
+    [
+        ("new", [[3, 2], [1]]),
+        ("old", [[1, 2], [3]]),
+        ("most_likes", [[2, 3], [1]]),
+    ],
+)
+async def test_get_all_posts_pagination(
+    async_client: AsyncClient,
+    logged_in_token: str,
+    sorting: str,
+    expected_pages: list[list[int]],
+):
+    for i in range(3):
+        await create_post(f"Test Post {i}", async_client, logged_in_token)
+    await like_post(2, async_client, logged_in_token)
+
+    pages = []
+    params = {"sorting": sorting, "limit": 2}
+    while True:
+        response = await async_client.get("/posts", params=params)
+        assert response.status_code == 200
+
+        data = response.json()
+        pages.append([post["id"] for post in data["posts"]])
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+
+    assert pages == expected_pages
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    # DB 정수 범위를 넘는 id는 드라이버에서 OverflowError(500)가 나던 경우
+    "cursor",
+    ["invalid", encode_cursor(likes=0, id=99999999999999999999999)],
+)
+async def test_get_all_posts_invalid_cursor(async_client: AsyncClient, cursor: str):
+    response = await async_client.get(
+        "/posts", params={"sorting": "most_likes", "cursor": cursor}
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_get_all_posts_limit_too_large(async_client: AsyncClient):
+    response = await async_client.get("/posts", params={"limit": 1000})
+
+    assert response.status_code == 422
+
+
 @pytest.mark.anyio
 async def test_get_all_posts_wrong_sorting(async_client: AsyncClient):
     response = await async_client.get("/posts", params={"sorting": "wrong"})
@@ -207,7 +318,7 @@ async def test_get_comments_on_post(
     response = await async_client.get(f"/posts/{created_post['id']}/comments")
 
     assert response.status_code == 200
-    assert response.json() == [created_comment]
+    assert response.json() == {"comments": [created_comment], "next_cursor": None}
 
 
 @pytest.mark.anyio
@@ -217,7 +328,47 @@ async def test_get_comments_on_post_empty(
     response = await async_client.get(f"/posts/{created_post['id']}/comments")
 
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {"comments": [], "next_cursor": None}
+
+
+@pytest.mark.anyio
+async def test_get_comments_on_post_pagination(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    comments = [
+        await create_comment(
+            f"Comment {i}", created_post["id"], async_client, logged_in_token
+        )
+        for i in range(3)
+    ]
+    url = f"/posts/{created_post['id']}/comments"
+
+    first = (await async_client.get(url, params={"limit": 2})).json()
+    second = (
+        await async_client.get(url, params={"limit": 2, "cursor": first["next_cursor"]})
+    ).json()
+
+    assert first["comments"] == comments[:2]
+    assert second == {"comments": comments[2:], "next_cursor": None}
+
+
+@pytest.mark.anyio
+async def test_comment_count_in_posts(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    # 캐시된 목록도 댓글을 쓰면 무효화되어야 함
+    response = await async_client.get("/posts")
+    assert response.json()["posts"][0]["comment_count"] == 0
+
+    await create_comment("Comment", created_post["id"], async_client, logged_in_token)
+    await async_client.post(
+        "/posts/comments/bulk",
+        json=[{"body": "First", "post_id": created_post["id"]}] * 2,
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    response = await async_client.get("/posts")
+    assert response.json()["posts"][0]["comment_count"] == 3
 
 
 @pytest.mark.anyio
@@ -228,11 +379,32 @@ async def test_get_post_with_comments(
 
     assert response.status_code == 200
     assert response.json() == {
-        "post": {**created_post, "likes": 0},
+        "post": {**created_post, "likes": 0, "comment_count": 1},
         "comments": [created_comment],
+        "next_cursor": None,
     }
 
 
+@pytest.mark.anyio
+async def test_get_post_with_comments_pagination(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    for i in range(3):
+        await create_comment(
+            f"Test Comment {i}", created_post["id"], async_client, logged_in_token
+        )
+
+    first = await async_client.get(f"/posts/{created_post['id']}", params={"limit": 2})
+    second = await async_client.get(
+        f"/posts/{created_post['id']}",
+        params={"limit": 2, "cursor": first.json()["next_cursor"]},
+    )
+
+    assert [comment["id"] for comment in first.json()["comments"]] == [1, 2]
+    assert [comment["id"] for comment in second.json()["comments"]] == [3]
+    assert second.json()["next_cursor"] is None
+
+
 @pytest.mark.anyio
 async def test_get_missing_post_with_comments(
     async_client: AsyncClient, created_post: dict, created_comment: dict
@@ -240,3 +412,568 @@ async def test_get_missing_post_with_comments(
     response = await async_client.get("/posts/2")
 
     assert response.status_code == 404
+
+
+@pytest.fixture()
+async def read_replica(logged_in_token: str):
+    # 같은 test.db에 따로 붙은 커넥션, primary는 롤백될 트랜잭션 안이라
+    # 커밋 전의 쓰기가 보이지 않음 (= 복제 지연)
+    replica = Database(config.DATABASE_URL)
+    await replica.connect()
+    read_replicas.append(replica)
+    yield replica
+    read_replicas.remove(replica)
+    await replica.disconnect()
+
+
+@pytest.mark.anyio
+async def test_read_your_writes(
+    async_client: AsyncClient, logged_in_token: str, read_replica: Database
+):
+    post = await create_post("Test Post", async_client, logged_in_token)
+
+    assert "recent_write" in async_client.cookies
+
+    response = await async_client.get("/posts")
+    assert [p["id"] for p in response.json()["posts"]] == [post["id"]]
+
+    # 쿠키가 만료되면 replica에서 읽음
+    async_client.cookies.clear()
+    response = await async_client.get("/posts")
+    assert response.json()["posts"] == []
+
+
+@pytest.mark.anyio
+async def test_get_all_posts_not_modified(
+    async_client: AsyncClient, created_post: dict, mocker
+):
+    response = await async_client.get("/posts")
+    etag = response.headers["etag"]
+
+    assert "last-modified" in response.headers
+
+    fetch_all = mocker.spy(database, "fetch_all")
+    response = await async_client.get("/posts", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    fetch_all.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_get_all_posts_cache_invalidated_by_write(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    response = await async_client.get("/posts")
+    etag = response.headers["etag"]
+
+    await like_post(created_post["id"], async_client, logged_in_token)
+    response = await async_client.get("/posts", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["posts"][0]["likes"] == 1
+
+
+@pytest.mark.anyio
+async def test_get_post_with_comments_cache_invalidated_by_comment(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    url = f"/posts/{created_post['id']}"
+    etag = (await async_client.get(url)).headers["etag"]
+
+    # 다른 게시글의 캐시는 그대로
+    other_post = await create_post("Other Post", async_client, logged_in_token)
+    await create_comment(
+        "Test Comment", other_post["id"], async_client, logged_in_token
+    )
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await create_comment(
+        "Test Comment", created_post["id"], async_client, logged_in_token
+    )
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["comments"]) == 1
+
+
+def test_post_and_likes_columns_match_model():
+    # 피드는 모델 검증 없이 행을 그대로 내보내므로 모양을 여기서 한 번 확인
+    assert set(post_and_likes_columns) == set(UserPostWithLikes.model_fields)
+
+
+@pytest.mark.anyio
+async def test_serialize_posts_page_matches_model(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    await like_post(created_post["id"], async_client, logged_in_token)
+    page = {
+        "posts": await database.fetch_all(select_post_and_likes),
+        "next_cursor": "cursor",
+    }
+
+    assert (
+        orjson.loads(serialize_posts_page(page))
+        == UserPostPage.model_validate(page).model_dump()
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "sorting, expected_order",
+    [("new", [2, 1]), ("old", [1, 2]), ("most_likes", [1, 2])],
+)
+async def test_export_posts(
+    async_client: AsyncClient,
+    logged_in_token: str,
+    sorting: str,
+    expected_order: list[int],
+):
+    await create_post("Test Post 1", async_client, logged_in_token)
+    await create_post("Test Post 2", async_client, logged_in_token)
+    await like_post(1, async_client, logged_in_token)
+
+    response = await async_client.get("/posts/export", params={"sorting": sorting})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [post["id"] for post in lines] == expected_order
+    assert set(lines[0]) == set(UserPostWithLikes.model_fields)
+
+
+@pytest.mark.anyio
+async def test_export_comments_on_post(
+    async_client: AsyncClient, created_comment: dict, logged_in_token: str
+):
+    await create_comment(
+        "Second", created_comment["post_id"], async_client, logged_in_token
+    )
+
+    response = await async_client.get(
+        f"/posts/{created_comment['post_id']}/comments/export"
+    )
+
+    lines = [orjson.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == created_comment
+    assert [comment["body"] for comment in lines] == ["Test Comment", "Second"]
+
+
+@pytest.mark.anyio
+async def test_create_posts_bulk(
+    async_client: AsyncClient, confirmed_user: dict, logged_in_token: str
+):
+    response = await async_client.post(
+        "/posts/bulk",
+        json=[{"body": "First"}, {"body": "Second"}, {"body": "Third"}],
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    assert response.status_code == 201
+    assert response.json() == [
+        {"id": 1, "body": "First", "user_id": confirmed_user["id"]},
+        {"id": 2, "body": "Second", "user_id": confirmed_user["id"]},
+        {"id": 3, "body": "Third", "user_id": confirmed_user["id"]},
+    ]
+
+
+@pytest.mark.anyio
+async def test_create_posts_bulk_limits(
+    async_client: AsyncClient, logged_in_token: str
+):
+    headers = {"Authorization": f"Bearer {logged_in_token}"}
+
+    response = await async_client.post("/posts/bulk", json=[], headers=headers)
+    assert response.status_code == 422
+
+    too_many = [{"body": "Post"}] * (config.BULK_MAX_BATCH_SIZE + 1)
+    response = await async_client.post("/posts/bulk", json=too_many, headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_create_comments_bulk(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    post_id = created_post["id"]
+    response = await async_client.post(
+        "/posts/comments/bulk",
+        json=[
+            {"body": "First", "post_id": post_id},
+            {"body": "Second", "post_id": post_id},
+        ],
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    assert response.status_code == 201
+    assert [comment["body"] for comment in response.json()] == ["First", "Second"]
+
+    response = await async_client.get(f"/posts/{post_id}/comments")
+    assert len(response.json()) == 2
+
+
+@pytest.mark.anyio
+async def test_create_comments_bulk_missing_post(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    response = await async_client.post(
+        "/posts/comments/bulk",
+        json=[
+            {"body": "First", "post_id": created_post["id"]},
+            {"body": "Second", "post_id": 123},
+        ],
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    assert response.status_code == 404
+    assert "123" in response.json()["detail"]
+
+    # 하나라도 없으면 아무것도 만들지 않음
+    response = await async_client.get(f"/posts/{created_post['id']}/comments")
+    assert response.json()["comments"] == []
+
+
+@pytest.mark.anyio
+async def test_like_posts_bulk(async_client: AsyncClient, logged_in_token: str):
+    headers = {"Authorization": f"Bearer {logged_in_token}"}
+    await create_post("Test Post 1", async_client, logged_in_token)
+    await create_post("Test Post 2", async_client, logged_in_token)
+
+    response = await async_client.post(
+        "/posts/like/bulk",
+        json=[{"post_id": 1}, {"post_id": 2}, {"post_id": 1}],
+        headers=headers,
+    )
+
+    assert response.status_code == 201
+    assert [like["post_id"] for like in response.json()] == [1, 2]
+
+    response = await async_client.get("/posts")
+    assert [post["likes"] for post in response.json()["posts"]] == [1, 1]
+
+    # 이미 좋아요한 게시글은 건너뜀
+    response = await async_client.post(
+        "/posts/like/bulk", json=[{"post_id": 2}], headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json() == []
+
+
+@pytest.mark.anyio
+async def test_create_comment_missing_post(
+    async_client: AsyncClient, logged_in_token: str, mocker
+):
+    fetch_one = mocker.spy(database, "fetch_one")
+
+    response = await async_client.post(
+        "/posts/comments",
+        json={"body": "Test Comment", "post_id": 123},
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    assert response.status_code == 404
+    # 존재 확인용 SELECT 없이 INSERT 한 번
+    fetch_one.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_like_missing_post(async_client: AsyncClient, logged_in_token: str):
+    response = await async_client.post(
+        "/posts/like",
+        json={"post_id": 123},
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_foreign_keys_enforced(confirmed_user: dict):
+    query = comment_table.insert().values(
+        body="Orphan", post_id=123, user_id=confirmed_user["id"]
+    )
+
+    with pytest.raises(integrity_errors):
+        await database.execute(query)
+
+
+async def unlike_post(
+    post_id: int, async_client: AsyncClient, logged_in_token: str
+) -> dict:
+    response = await async_client.post(
+        "/posts/unlike",
+        json={"post_id": post_id},
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    return response.json()
+
+
+@pytest.mark.anyio
+async def test_unlike_post(
+    async_client: AsyncClient, created_post: dict, logged_in_token: str
+):
+    await like_post(created_post["id"], async_client, logged_in_token)
+
+    state = await unlike_post(created_post["id"], async_client, logged_in_token)
+    assert state == {"post_id": created_post["id"], "liked": False, "likes": 0}
+
+    # 좋아요하지 않은 상태에서 다시 취소해도 그대로
+    state = await unlike_post(created_post["id"], async_client, logged_in_token)
+    assert state["likes"] == 0
+
+    state = await like_post(created_post["id"], async_client, logged_in_token)
+    assert state == {"post_id": created_post["id"], "liked": True, "likes": 1}
+
+
+@pytest.mark.anyio
+async def test_unlike_missing_post(async_client: AsyncClient, logged_in_token: str):
+    response = await async_client.post(
+        "/posts/unlike",
+        json={"post_id": 123},
+        headers={"Authorization": f"Bearer {logged_in_token}"},
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.fixture()
+async def buffered_likes(mocker):
+    mocker.patch.object(like_buffer, "enabled", True)
+    mocker.patch.object(like_buffer, "window", 60)
+    yield like_buffer
+    await like_buffer.flush()
+
+
+@pytest.mark.anyio
+async def test_like_post_buffered(
+    async_client: AsyncClient,
+    created_post: dict,
+    logged_in_token: str,
+    buffered_likes,
+):
+    await like_post(created_post["id"], async_client, logged_in_token)
+    state = await like_post(created_post["id"], async_client, logged_in_token)
+
+    assert state == {"post_id": created_post["id"], "liked": True, "likes": 1}
+    # 아직 DB에는 없지만 개수에는 포함
+    assert await database.fetch_all(like_table.select()) == []
+    response = await async_client.get("/posts")
+    assert response.json()["posts"][0]["likes"] == 1
+
+    await buffered_likes.flush()
+
+    response = await async_client.get(f"/posts/{created_post['id']}")
+    assert response.json()["post"]["likes"] == 1
+    assert len(await database.fetch_all(like_table.select())) == 1
+
+
+@pytest.mark.anyio
+async def test_unlike_post_buffered(
+    async_client: AsyncClient,
+    created_post: dict,
+    logged_in_token: str,
+    buffered_likes,
+):
+    await like_post(created_post["id"], async_client, logged_in_token)
+
+    state = await unlike_post(created_post["id"], async_client, logged_in_token)
+
+    assert state == {"post_id": created_post["id"], "liked": False, "likes": 0}
+    assert buffered_likes.size == 0
+
+
+@pytest.mark.anyio
+async def test_unlike_post_while_flush_fails(
+    async_client: AsyncClient,
+    created_post: dict,
+    logged_in_token: str,
+    confirmed_user: dict,
+    buffered_likes,
+    mocker,
+):
+    released = asyncio.Event()
+
+    async def failing_write(likes):
+        await released.wait()
+        raise RuntimeError
+
+    await like_post(created_post["id"], async_client, logged_in_token)
+    mocker.patch.object(buffered_likes, "_write", side_effect=failing_write)
+    flush = asyncio.create_task(buffered_likes.flush())
+    await asyncio.sleep(0)
+
+    # flush 중에 취소, flush가 실패해서 pending으로 돌아와도 다시 쓰이면 안 됨
+    unlike = asyncio.create_task(
+        unlike_post(created_post["id"], async_client, logged_in_token)
+    )
+    await asyncio.sleep(0.01)
+    released.set()
+    await flush
+    state = await unlike
+
+    assert state == {"post_id": created_post["id"], "liked": False, "likes": 0}
+    assert not buffered_likes.contains(created_post["id"], confirmed_user["id"])
+    assert buffered_likes.pending(created_post["id"]) == 0
+
+
+@pytest.mark.anyio
+async def test_buffered_likes_invalidate_cache(
+    async_client: AsyncClient,
+    created_post: dict,
+    logged_in_token: str,
+    buffered_likes,
+):
+    post_url = f"/posts/{created_post['id']}"
+    # 좋아요 전에 캐시된 목록/상세
+    await async_client.get("/posts")
+    await async_client.get(post_url)
+
+    await like_post(created_post["id"], async_client, logged_in_token)
+
+    assert (await async_client.get("/posts")).json()["posts"][0]["likes"] == 1
+    assert (await async_client.get(post_url)).json()["post"]["likes"] == 1
+
+    await unlike_post(created_post["id"], async_client, logged_in_token)
+
+    assert (await async_client.get("/posts")).json()["posts"][0]["likes"] == 0
+    assert (await async_client.get(post_url)).json()["post"]["likes"] == 0
+
+
+@pytest.mark.anyio
+async def test_search_posts(async_client: AsyncClient, logged_in_token: str):
+    await create_post("Cats are great", async_client, logged_in_token)
+    await create_post("Dogs are great", async_client, logged_in_token)
+    await create_post("Cats and cats and more cats", async_client, logged_in_token)
+    await create_comment("My cat agrees", 2, async_client, logged_in_token)
+
+    response = await async_client.get("/posts/search", params={"q": "cat"})
+
+    assert response.status_code == 200
+    # 본문에 많이 나올수록 위로, 댓글에서만 찾은 것은 마지막
+    assert [post["id"] for post in response.json()["posts"]] == [3, 1, 2]
+    assert set(response.json()["posts"][0]) == set(UserPostWithLikes.model_fields)
+
+
+@pytest.mark.anyio
+async def test_search_posts_all_terms(async_client: AsyncClient, logged_in_token: str):
+    await create_post("Cats are great", async_client, logged_in_token)
+    await create_post("Dogs are great", async_client, logged_in_token)
+
+    response = await async_client.get("/posts/search", params={"q": "great dogs"})
+
+    assert [post["id"] for post in response.json()["posts"]] == [2]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("q", ['"cat', "cat AND", "NEAR(", "?!"])
+async def test_search_posts_special_characters(
+    async_client: AsyncClient, created_post: dict, q: str
+):
+    response = await async_client.get("/posts/search", params={"q": q})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_search_posts_pagination(async_client: AsyncClient, logged_in_token: str):
+    for i in range(5):
+        await create_post(f"Post {i} about search", async_client, logged_in_token)
+
+    ids = []
+    cursor = None
+    while True:
+        params = {"q": "search", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await async_client.get("/posts/search", params=params)).json()
+        ids += [post["id"] for post in page["posts"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    assert len(ids) == 5
+
+
+async def lookup_posts(async_client: AsyncClient, ids: list[int], **body):
+    return await async_client.post("/posts/lookup", json={"ids": ids, **body})
+
+
+@pytest.mark.anyio
+async def test_lookup_posts(async_client: AsyncClient, logged_in_token: str):
+    posts = [
+        await create_post(f"Post {i}", async_client, logged_in_token) for i in range(3)
+    ]
+    ids = [posts[2]["id"], 999, posts[0]["id"], posts[2]["id"]]
+
+    response = await lookup_posts(async_client, ids)
+
+    # 요청한 순서대로, 없는 글은 빼고 중복은 한 번만
+    assert response.status_code == 200
+    assert response.json() == {
+        "posts": [
+            {
+                "post": {**posts[i], "likes": 0, "comment_count": 0},
+                "comments": [],
+                "next_cursor": None,
+            }
+            for i in (2, 0)
+        ]
+    }
+
+
+@pytest.mark.anyio
+async def test_lookup_posts_with_comments(
+    async_client: AsyncClient, logged_in_token: str
+):
+    posts = [
+        await create_post(f"Post {i}", async_client, logged_in_token) for i in range(2)
+    ]
+    comments = [
+        await create_comment(
+            f"Comment {i}", posts[0]["id"], async_client, logged_in_token
+        )
+        for i in range(3)
+    ]
+    other = await create_comment("Other", posts[1]["id"], async_client, logged_in_token)
+
+    response = await lookup_posts(
+        async_client, [posts[1]["id"], posts[0]["id"]], comments=2
+    )
+
+    first, second = response.json()["posts"]
+    assert first["comments"] == [other]
+    assert first["next_cursor"] is None
+    assert second["comments"] == comments[:2]
+
+    # 나머지는 GET /posts/{id}로 이어서
+    response = await async_client.get(
+        f"/posts/{posts[0]['id']}", params={"cursor": second["next_cursor"]}
+    )
+    assert response.json()["comments"] == comments[2:]
+
+
+@pytest.mark.anyio
+async def test_lookup_posts_query_count(
+    async_client: AsyncClient, logged_in_token: str, mocker
+):
+    ids = [
+        (await create_post(f"Post {i}", async_client, logged_in_token))["id"]
+        for i in range(5)
+    ]
+    fetch_all = mocker.spy(Database, "fetch_all")
+
+    response = await lookup_posts(async_client, ids, comments=3)
+
+    assert len(response.json()["posts"]) == 5
+    assert fetch_all.call_count == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("ids", [[], list(range(config.POST_LOOKUP_MAX_IDS + 1))])
+async def test_lookup_posts_invalid_ids(async_client: AsyncClient, ids: list[int]):
+    response = await lookup_posts(async_client, ids)
+
+    assert response.status_code == 422
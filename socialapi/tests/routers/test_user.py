@@ -1,7 +1,10 @@
 import pytest
-from fastapi import BackgroundTasks
 from httpx import AsyncClient
 
+from socialapi import tasks
+from socialapi.database import database, engine, post_table, user_table
+from socialapi.routers.post import select_post_and_likes
+
 
 async def register_user(async_client: AsyncClient, email: str, password: str):
     return await async_client.post(
@@ -31,7 +34,7 @@ async def test_register_user_already_exists(
 
 @pytest.mark.anyio
 async def test_confirm_user(async_client: AsyncClient, mocker):
-    spy = mocker.spy(BackgroundTasks, "add_task")
+    spy = mocker.spy(tasks.registration_batcher, "add")
     await register_user(async_client, "test@test.com", "1234")
     confirmation_url = str(spy.call_args[1]["confirmation_url"])
     response = await async_client.get(confirmation_url)
@@ -50,7 +53,7 @@ async def test_confirm_user_invalid_token(async_client: AsyncClient):
 @pytest.mark.anyio
 async def test_confirm_user_expired_token(async_client: AsyncClient, mocker):
     mocker.patch("socialapi.security.confirm_token_expire_minutes", return_value=-1)
-    spy = mocker.spy(BackgroundTasks, "add_task")
+    spy = mocker.spy(tasks.registration_batcher, "add")
     await register_user(async_client, "test@test.com", "1234")
     confirmation_url = str(spy.call_args[1]["confirmation_url"])
     response = await async_client.get(confirmation_url)
@@ -94,3 +97,92 @@ async def test_login_user(async_client: AsyncClient, confirmed_user: dict):
     )
 
     assert response.status_code == 200
+
+
+@pytest.fixture()
+async def user_posts(confirmed_user: dict) -> list[int]:
+    # 다른 사용자의 글 사이사이에 섞어서
+    other_id = await database.execute(
+        user_table.insert().values(email="other@test.com", password="x")
+    )
+    post_ids = []
+    for i in range(3):
+        post_ids.append(
+            await database.execute(
+                post_table.insert().values(
+                    body=f"Mine {i}", user_id=confirmed_user["id"]
+                )
+            )
+        )
+        await database.execute(
+            post_table.insert().values(body=f"Other {i}", user_id=other_id)
+        )
+
+    return post_ids
+
+
+@pytest.mark.anyio
+async def test_get_user_posts(
+    async_client: AsyncClient, confirmed_user: dict, user_posts: list[int]
+):
+    response = await async_client.get(f"/users/{confirmed_user['id']}/posts")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "posts": [
+            {
+                "id": post_id,
+                "body": f"Mine {i}",
+                "user_id": confirmed_user["id"],
+                "likes": 0,
+                "comment_count": 0,
+            }
+            for i, post_id in reversed(list(enumerate(user_posts)))
+        ],
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.anyio
+async def test_get_user_posts_pagination(
+    async_client: AsyncClient, confirmed_user: dict, user_posts: list[int]
+):
+    url = f"/users/{confirmed_user['id']}/posts"
+    first = (await async_client.get(url, params={"limit": 2})).json()
+    second = (
+        await async_client.get(url, params={"limit": 2, "cursor": first["next_cursor"]})
+    ).json()
+
+    assert [post["id"] for post in first["posts"]] == user_posts[:0:-1]
+    assert [post["id"] for post in second["posts"]] == user_posts[:1]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_get_user_posts_without_posts(
+    async_client: AsyncClient, confirmed_user: dict
+):
+    response = await async_client.get(f"/users/{confirmed_user['id']}/posts")
+
+    assert response.status_code == 200
+    assert response.json() == {"posts": [], "next_cursor": None}
+
+
+@pytest.mark.anyio
+async def test_get_user_posts_user_not_found(async_client: AsyncClient):
+    response = await async_client.get("/users/999/posts")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_get_user_posts_uses_index(confirmed_user: dict):
+    query = select_post_and_likes.where(post_table.c.user_id == 1).order_by(
+        post_table.c.id.desc()
+    )
+    compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+    plan = await database.fetch_all(f"EXPLAIN QUERY PLAN {compiled}")
+
+    details = " ".join(row.detail for row in plan)
+    assert "ix_posts_user_id_id" in details
+    assert "TEMP B-TREE" not in details
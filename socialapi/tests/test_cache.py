@@ -0,0 +1,43 @@
+import time
+
+from socialapi.cache import TTLCache
+
+
+def test_ttl_cache_get_set():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl_cache_expires(mocker):
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+
+    mocker.patch("socialapi.cache.time.monotonic", return_value=time.monotonic() + 61)
+
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_delete():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    cache.delete("key")
+    cache.delete("missing")
+
+    assert cache.get("key") is None
@@ -0,0 +1,51 @@
+import pytest
+
+from socialapi.commands import reconcile_comment_counts, reconcile_like_counts
+from socialapi.database import comment_table, database, like_table, post_table
+
+
+@pytest.fixture()
+async def liked_post(confirmed_user: dict) -> int:
+    post_id = await database.execute(
+        post_table.insert().values(body="Test Post", user_id=confirmed_user["id"])
+    )
+    await database.execute(
+        like_table.insert().values(post_id=post_id, user_id=confirmed_user["id"])
+    )
+
+    return post_id
+
+
+@pytest.mark.anyio
+async def test_reconcile_like_counts(liked_post: int):
+    fixed = await reconcile_like_counts()
+
+    post = await database.fetch_one(
+        post_table.select().where(post_table.c.id == liked_post)
+    )
+    assert fixed == 1
+    assert post.like_count == 1
+
+
+@pytest.mark.anyio
+async def test_reconcile_like_counts_nothing_to_fix(liked_post: int):
+    await reconcile_like_counts()
+
+    assert await reconcile_like_counts() == 0
+
+
+@pytest.mark.anyio
+async def test_reconcile_comment_counts(liked_post: int, confirmed_user: dict):
+    await database.execute(
+        comment_table.insert().values(
+            body="Comment", post_id=liked_post, user_id=confirmed_user["id"]
+        )
+    )
+
+    fixed = await reconcile_comment_counts()
+
+    post = await database.fetch_one(
+        post_table.select().where(post_table.c.id == liked_post)
+    )
+    assert fixed == 1
+    assert post.comment_count == 1
@@ -0,0 +1,105 @@
+from typing import Generator
+
+import pytest
+
+from socialapi.database import database, like_table, post_table
+from socialapi.like_buffer import LikeBuffer
+
+
+@pytest.fixture()
+def buffer() -> Generator:
+    # 타이머로 flush되지 않도록 window를 길게
+    yield LikeBuffer(database, enabled=True, window=60, max_size=3)
+
+
+@pytest.fixture()
+async def post_id(confirmed_user: dict) -> int:
+    query = post_table.insert().values(body="Test Post", user_id=confirmed_user["id"])
+    return await database.execute(query)
+
+
+async def like_count(post_id: int) -> int:
+    query = post_table.select().where(post_table.c.id == post_id)
+    return (await database.fetch_one(query)).like_count
+
+
+@pytest.mark.anyio
+async def test_add_dedupes(buffer: LikeBuffer, post_id: int):
+    assert await buffer.add(post_id, 1) is True
+    assert await buffer.add(post_id, 1) is False
+    await buffer.add(post_id, 2)
+
+    assert buffer.pending(post_id) == 2
+    assert await like_count(post_id) == 0
+
+
+@pytest.mark.anyio
+async def test_flush(buffer: LikeBuffer, post_id: int, confirmed_user: dict):
+    await buffer.add(post_id, confirmed_user["id"])
+
+    await buffer.flush()
+
+    assert buffer.pending(post_id) == 0
+    assert await like_count(post_id) == 1
+    assert len(await database.fetch_all(like_table.select())) == 1
+
+
+@pytest.mark.anyio
+async def test_flush_skips_existing_likes(
+    buffer: LikeBuffer, post_id: int, confirmed_user: dict
+):
+    await database.execute(
+        like_table.insert().values(post_id=post_id, user_id=confirmed_user["id"])
+    )
+    await buffer.add(post_id, confirmed_user["id"])
+
+    await buffer.flush()
+
+    # like_count는 ON CONFLICT로 무시된 좋아요만큼 늘지 않음
+    assert await like_count(post_id) == 0
+
+
+@pytest.mark.anyio
+async def test_flush_when_full(buffer: LikeBuffer, post_id: int, mocker):
+    write = mocker.patch.object(buffer, "_write")
+
+    for user_id in range(3):
+        await buffer.add(post_id, user_id)
+
+    write.assert_called_once()
+    assert buffer.size == 0
+
+
+@pytest.mark.anyio
+async def test_flush_failure_keeps_likes(buffer: LikeBuffer, post_id: int, mocker):
+    mocker.patch.object(buffer, "_write", side_effect=RuntimeError)
+    await buffer.add(post_id, 1)
+
+    await buffer.flush()
+
+    assert buffer.size == 1
+    assert buffer.pending(post_id) == 1
+
+
+@pytest.mark.anyio
+async def test_flush_failure_retries_later(buffer: LikeBuffer, post_id: int, mocker):
+    write = mocker.patch.object(buffer, "_write", side_effect=[RuntimeError, None])
+    await buffer.add(post_id, 1)
+    buffer.window = 0
+
+    await buffer.flush()
+    # 좋아요가 더 들어오지 않아도 타이머로 다시 flush
+    await buffer._timer
+
+    assert write.call_count == 2
+    assert buffer.size == 0
+    assert buffer.pending(post_id) == 0
+
+
+@pytest.mark.anyio
+async def test_discard(buffer: LikeBuffer, post_id: int):
+    await buffer.add(post_id, 1)
+
+    assert buffer.discard(post_id, 1) is True
+    assert buffer.discard(post_id, 1) is False
+    assert buffer.pending(post_id) == 0
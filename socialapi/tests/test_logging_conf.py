@@ -0,0 +1,103 @@
+import logging
+import sys
+from logging.handlers import BufferingHandler
+
+import pytest
+
+from socialapi.logging_conf import (
+    BoundedQueueHandler,
+    EmailObfuscationFilter,
+    configure_logging,
+    start_queue_listener,
+    stop_logging,
+)
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+@pytest.mark.parametrize(
+    "drop_policy, expected_messages, expected_dropped",
+    [("drop_new", ["1", "2"], 1), ("drop_oldest", ["2", "3"], 1)],
+)
+def test_bounded_queue_handler_drop_policy(
+    drop_policy: str, expected_messages: list[str], expected_dropped: int
+):
+    handler = BoundedQueueHandler(maxsize=2, drop_policy=drop_policy)
+
+    for message in ["1", "2", "3"]:
+        handler.handle(make_record(message))
+
+    messages = [handler.queue.get_nowait().msg for _ in range(handler.queue.qsize())]
+    assert messages == expected_messages
+    assert handler.dropped == expected_dropped
+
+
+def test_start_queue_listener():
+    target = BufferingHandler(capacity=100)
+    target.addFilter(EmailObfuscationFilter(obfuscated_length=2))
+    logger = logging.getLogger("socialapi.tests.queue")
+    logger.handlers = [target]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    listener = start_queue_listener([logger])
+    logger.info("Test", extra={"email": "test@test.com"})
+    listener.stop()
+
+    assert isinstance(logger.handlers[0], BoundedQueueHandler)
+    assert target.filters == []
+    assert [record.email for record in target.buffer] == ["te**@test.com"]
+
+
+def test_bounded_queue_handler_keeps_exc_text():
+    handler = BoundedQueueHandler(maxsize=1, drop_policy="drop_new")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "test", logging.ERROR, __file__, 1, "Failed %s", ("job",), sys.exc_info()
+        )
+
+    prepared = handler.prepare(record)
+
+    # traceback은 message에 합치지 않고 exc_text로 (JSON 로그의 exc_info 필드)
+    assert prepared.message == "Failed job"
+    assert prepared.exc_info is None
+    assert "ValueError: boom" in prepared.exc_text
+
+
+@pytest.fixture()
+def configured_logging(tmp_path, monkeypatch):
+    # 다른 테스트의 caplog가 깨지지 않도록 설정 전 상태로 되돌리기
+    names = [
+        "uvicorn",
+        "socialapi",
+        "socialapi.query_logging",
+        "databases",
+        "aiosqlite",
+    ]
+    saved = {
+        name: (list(logger.handlers), logger.level, logger.propagate)
+        for name in names
+        for logger in [logging.getLogger(name)]
+    }
+    # rotating_file 핸들러가 socialapi.log를 만들지 않도록
+    monkeypatch.chdir(tmp_path)
+
+    configure_logging()
+    yield
+    stop_logging()
+
+    for name, (handlers, level, propagate) in saved.items():
+        logger = logging.getLogger(name)
+        logger.handlers, logger.level, logger.propagate = handlers, level, propagate
+
+
+@pytest.mark.parametrize("name", ["databases", "aiosqlite"])
+def test_configure_logging_library_loggers(name: str, configured_logging):
+    # 필터를 떼어낸 공용 핸들러에 바로 가면 test_property가 없어서 ValueError
+    logging.getLogger(name).warning("Test")
+
+    assert isinstance(logging.getLogger(name).handlers[0], BoundedQueueHandler)
@@ -0,0 +1,27 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.anyio
+async def test_metrics(async_client: AsyncClient):
+    await async_client.get("/posts")
+    await async_client.get("/posts/123")
+
+    response = await async_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/posts"}'
+        in response.text
+    )
+    assert (
+        'http_responses_total{method="GET",route="/posts/{post_id}",status="404"}'
+        in response.text
+    )
+    assert (
+        'db_query_duration_seconds_count{name="get_all_posts",operation="fetch_all"}'
+        in response.text
+    )
+    assert "http_requests_in_flight" in response.text
+    assert 'cache_hits_total{cache="user"}' in response.text
+    assert "password_hash_waiting" in response.text
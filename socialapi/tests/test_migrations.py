@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+import sqlalchemy
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+
+from socialapi.database import is_search_table, metadata
+
+ALEMBIC_INI = Path(__file__).parents[2] / "alembic.ini"
+
+
+@pytest.fixture()
+def database_url(tmp_path: Path) -> str:
+    return f"sqlite:///{tmp_path / 'migrations.db'}"
+
+
+@pytest.fixture()
+def alembic_config(database_url: str) -> Config:
+    alembic_config = Config(ALEMBIC_INI)
+    alembic_config.set_main_option("sqlalchemy.url", database_url)
+    alembic_config.attributes["configure_logger"] = False
+
+    return alembic_config
+
+
+def test_migrations_match_models(alembic_config: Config, database_url: str):
+    command.upgrade(alembic_config, "head")
+
+    engine = sqlalchemy.create_engine(database_url)
+    with engine.connect() as connection:
+        # FTS5 가상 테이블(과 shadow 테이블)은 모델에 없음
+        context = MigrationContext.configure(
+            connection,
+            opts={
+                "include_name": lambda name, type_, _: not (
+                    type_ == "table" and is_search_table(name)
+                )
+            },
+        )
+        diff = compare_metadata(context, metadata)
+
+    assert diff == []
+
+
+def test_migrations_downgrade(alembic_config: Config, database_url: str):
+    command.upgrade(alembic_config, "head")
+    command.downgrade(alembic_config, "base")
+
+    engine = sqlalchemy.create_engine(database_url)
+
+    assert sqlalchemy.inspect(engine).get_table_names() == ["alembic_version"]
+
+
+def test_migrations_remove_duplicated_likes(alembic_config: Config, database_url):
+    command.upgrade(alembic_config, "0002")
+
+    engine = sqlalchemy.create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text("INSERT INTO users (id) VALUES (1)"))
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO posts (id, user_id, like_count) VALUES (1, 1, 2)"
+            )
+        )
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO likes (post_id, user_id) VALUES (1, 1), (1, 1)"
+            )
+        )
+
+    command.upgrade(alembic_config, "head")
+
+    with engine.connect() as connection:
+        likes = connection.scalar(sqlalchemy.text("SELECT count(*) FROM likes"))
+        like_count = connection.scalar(sqlalchemy.text("SELECT like_count FROM posts"))
+
+    assert likes == 1
+    assert like_count == 1
+
+
+def test_migrations_backfill_comment_counts(alembic_config: Config, database_url):
+    command.upgrade(alembic_config, "0006")
+
+    engine = sqlalchemy.create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text("INSERT INTO users (id) VALUES (1)"))
+        connection.execute(
+            sqlalchemy.text("INSERT INTO posts (id, user_id) VALUES (1, 1), (2, 1)")
+        )
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO comments (post_id, user_id) VALUES (1, 1), (1, 1)"
+            )
+        )
+
+    command.upgrade(alembic_config, "head")
+
+    with engine.connect() as connection:
+        counts = connection.execute(
+            sqlalchemy.text("SELECT id, comment_count FROM posts ORDER BY id")
+        ).all()
+
+    assert counts == [(1, 2), (2, 0)]
@@ -0,0 +1,28 @@
+import pytest
+from fastapi import HTTPException
+
+from socialapi.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(likes=3, id=42)
+
+    assert decode_cursor(cursor, "likes", "id") == {"likes": 3, "id": 42}
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "invalid",
+        encode_cursor(id="1"),
+        "W10",
+        encode_cursor(likes=0, id=99999999999999999999999),
+        encode_cursor(likes=True, id=1),
+        encode_cursor(likes=float("nan"), id=1),
+    ],
+)
+def test_decode_cursor_invalid(cursor: str):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, "likes", "id")
+
+    assert exc_info.value.status_code == 400
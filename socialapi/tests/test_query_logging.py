@@ -0,0 +1,84 @@
+import logging
+
+import pytest
+
+from socialapi.database import database, post_table, user_table
+from socialapi.query_logging import QueryLogger
+
+
+@pytest.fixture()
+def query_logger() -> QueryLogger:
+    logger = logging.getLogger("socialapi.tests.query_logging")
+    logger.setLevel(logging.DEBUG)
+
+    return QueryLogger(logger, sample_rate=1)
+
+
+def test_render_compiles_once_per_shape(query_logger: QueryLogger, mocker):
+    first = post_table.select().where(post_table.c.id == 1)
+    second = post_table.select().where(post_table.c.id == 2)
+
+    first_sql, first_params = query_logger.render(first)
+    spy = mocker.spy(type(second), "compile")
+    second_sql, second_params = query_logger.render(second)
+
+    assert first_sql == second_sql
+    assert list(first_params.values()) == [1]
+    assert list(second_params.values()) == [2]
+    spy.assert_not_called()
+
+
+def test_render_text_query(query_logger: QueryLogger):
+    assert query_logger.render("SELECT :id", {"id": 1}) == ("SELECT :id", {"id": 1})
+
+
+def test_log(query_logger: QueryLogger, caplog):
+    query = post_table.select().where(post_table.c.id == 1)
+
+    with caplog.at_level(logging.DEBUG, logger=query_logger.logger.name):
+        query_logger.log("find_post", query, None, 0.0015)
+
+    record = caplog.records[0]
+    assert "FROM posts" in record.message
+    assert record.query_name == "find_post"
+    assert list(record.query_params.values()) == [1]
+    assert record.elapsed_ms == 1.5
+
+
+def test_log_masks_password_and_email(query_logger: QueryLogger, caplog):
+    register = user_table.insert().values(
+        email="test@example.net", password="$2b$12$secrethash"
+    )
+    get_user = user_table.select().where(user_table.c.email == "test@example.net")
+
+    with caplog.at_level(logging.DEBUG, logger=query_logger.logger.name):
+        query_logger.log("register", register, None, 0.001)
+        query_logger.log("get_user", get_user, None, 0.001)
+
+    inserted, selected = (record.query_params for record in caplog.records)
+    assert "$2b$12$secrethash" not in str(inserted)
+    assert inserted["email"] == "****@example.net"
+    assert selected == {"email_1": "****@example.net"}
+
+
+@pytest.mark.parametrize("level, sample_rate", [(logging.INFO, 1), (logging.DEBUG, 0)])
+def test_log_disabled_does_not_render(
+    query_logger: QueryLogger, mocker, level: int, sample_rate: float
+):
+    query_logger.logger.setLevel(level)
+    query_logger.sample_rate = sample_rate
+    spy = mocker.spy(query_logger, "render")
+
+    query_logger.log("find_post", post_table.select(), None, 0.001)
+
+    spy.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_database_logs_named_queries(mocker):
+    log = mocker.patch("socialapi.database.query_logger.log")
+
+    await database.fetch_one(user_table.select(), name="get_user")
+    await database.fetch_all(user_table.select())
+
+    assert [call.args[0] for call in log.call_args_list] == ["get_user", "select"]
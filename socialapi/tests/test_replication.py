@@ -0,0 +1,43 @@
+from unittest.mock import Mock
+
+from socialapi import database as db
+from socialapi.replication import (
+    RECENT_WRITE_COOKIE,
+    get_read_database,
+    mark_recent_write,
+)
+
+
+def test_read_database_without_replicas():
+    assert db.read_database() is db.database
+
+
+def test_read_database_round_robin(mocker):
+    replicas = [Mock(), Mock()]
+    mocker.patch.object(db, "read_replicas", replicas)
+
+    picked = [db.read_database() for _ in range(4)]
+
+    assert set(map(id, picked)) == set(map(id, replicas))
+    assert picked[0] is picked[2]
+    assert picked[1] is picked[3]
+
+
+def test_get_read_database_after_write(mocker):
+    mocker.patch.object(db, "read_replicas", [Mock()])
+
+    assert get_read_database(Mock(cookies={})) is db.read_replicas[0]
+    assert get_read_database(Mock(cookies={RECENT_WRITE_COOKIE: "1"})) is db.database
+
+
+def test_mark_recent_write_without_replicas():
+    response = Mock()
+
+    mark_recent_write(response)
+
+    response.set_cookie.assert_not_called()
+
+
+def test_pool_args():
+    assert db.pool_args("sqlite:///test.db") == {"factory": db.SQLiteConnection}
+    assert db.pool_args("postgresql://localhost/db")["max_size"] == 3
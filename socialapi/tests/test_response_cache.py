@@ -0,0 +1,30 @@
+import pytest
+
+from socialapi.cache import TTLCache
+from socialapi.response_cache import ResponseCache, etag_matches
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ('"xyz"', False),
+        ("*", True),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, '"abc"') is expected
+
+
+def test_bump_changes_only_its_scope():
+    cache = ResponseCache(TTLCache(maxsize=10, ttl=60))
+    before = cache.versions(["posts", ("post", 1)])
+
+    cache.bump(("post", 1))
+    after = cache.versions(["posts", ("post", 1)])
+
+    assert after[0] == before[0]
+    assert after[1][0] == before[1][0] + 1
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from fastapi import HTTPException
 from jose import jwt
@@ -45,6 +47,40 @@ def test_get_subject_for_token_type_valid_access():
     assert email == security.get_subject_for_token_type(token, "access")
 
 
+def test_get_subject_for_token_type_cached(mocker):
+    email = "test@test.com"
+    token = security.create_access_token(email)
+    security.get_subject_for_token_type(token, "access")
+    spy = mocker.spy(security, "decode_token")
+
+    assert email == security.get_subject_for_token_type(token, "access")
+    spy.assert_not_called()
+
+
+def test_get_subject_for_token_type_cached_wrong_type():
+    token = security.create_confirmation_token("test@test.com")
+    security.get_subject_for_token_type(token, "confirmation")
+
+    with pytest.raises(security.HTTPException) as exc_info:
+        security.get_subject_for_token_type(token, "access")
+
+    assert "Token has incorrect type, expected 'access'" == exc_info.value.detail
+
+
+def test_get_subject_for_token_type_pyjwt(mocker):
+    pytest.importorskip("jwt")
+    mocker.patch.object(security.config, "JWT_BACKEND", "pyjwt")
+    email = "test@test.com"
+    token = security.create_access_token(email)
+
+    assert email == security.get_subject_for_token_type(token, "access")
+
+    with pytest.raises(security.HTTPException) as exc_info:
+        security.get_subject_for_token_type("invalid token", "access")
+
+    assert "Invalid token" == exc_info.value.detail
+
+
 def test_get_subject_for_token_type_expired(mocker):
     mocker.patch("socialapi.security.access_token_expire_minutes", return_value=-1)
     email = "test@test.com"
@@ -95,6 +131,31 @@ def test_password_hashes():
     assert security.verify_password(password, security.get_password_hash(password))
 
 
+@pytest.mark.anyio
+async def test_password_hashes_async():
+    password = "password"
+    hashed_password = await security.get_password_hash_async(password)
+
+    assert await security.verify_password_async(password, hashed_password)
+    assert not await security.verify_password_async("wrong", hashed_password)
+
+
+@pytest.mark.anyio
+async def test_password_hasher_limits_concurrency():
+    hasher = security.PasswordHasher("thread", max_workers=1)
+    try:
+        await asyncio.gather(
+            *(hasher.run(security.get_password_hash, "password") for _ in range(3))
+        )
+    finally:
+        hasher.shutdown()
+
+    assert hasher.stats.completed == 3
+    assert hasher.stats.max_waiting == 2
+    assert hasher.stats.in_flight == 0
+    assert hasher.stats.waiting == 0
+
+
 @pytest.mark.anyio
 async def test_get_user(registered_user: dict):
     user = await security.get_user(registered_user["email"])
@@ -102,6 +163,51 @@ async def test_get_user(registered_user: dict):
     assert user.email == registered_user["email"]
 
 
+@pytest.mark.anyio
+async def test_get_user_cached(registered_user: dict, mocker):
+    await security.get_user(registered_user["email"])
+    spy = mocker.spy(security.database, "fetch_one")
+
+    user = await security.get_user(registered_user["email"])
+    user_by_id = await security.get_user_by_id(registered_user["id"])
+
+    assert user.email == registered_user["email"]
+    assert user_by_id.email == registered_user["email"]
+    spy.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_invalidate_user(registered_user: dict):
+    user = await security.get_user(registered_user["email"])
+    await security.database.execute(
+        security.user_table.update()
+        .where(security.user_table.c.id == user.id)
+        .values(confirmed=True)
+    )
+
+    security.invalidate_user(registered_user["email"])
+
+    assert (await security.get_user(registered_user["email"])).confirmed
+    assert (await security.get_user_by_id(registered_user["id"])).confirmed
+
+
+@pytest.mark.anyio
+async def test_get_user_with_db_skips_cache(registered_user: dict):
+    await security.get_user(registered_user["email"])
+    await security.database.execute(
+        security.user_table.update()
+        .where(security.user_table.c.id == registered_user["id"])
+        .values(confirmed=True)
+    )
+
+    # 캐시를 지우지 않아도 db를 주면 최신 값을 읽고 캐시도 바꿈
+    user = await security.get_user(registered_user["email"], db=security.database)
+
+    assert user.confirmed
+    assert (await security.get_user(registered_user["email"])).confirmed
+    assert (await security.get_user_by_id(registered_user["id"])).confirmed
+
+
 @pytest.mark.anyio
 async def test_get_user_not_found():
     user = await security.get_user("not-found@test.com")
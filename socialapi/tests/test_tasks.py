@@ -1,7 +1,23 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
 import httpx
 import pytest
 
-from socialapi.tasks import APIResponseError, send_simple_email
+from socialapi import tasks
+from socialapi.tasks import (
+    APIClientError,
+    APIResponseError,
+    MailQueue,
+    send_simple_email,
+)
+
+
+def mailgun_response(status_code: int) -> httpx.Response:
+    return httpx.Response(
+        status_code=status_code, content="", request=httpx.Request("POST", "//")
+    )
 
 
 @pytest.mark.anyio
@@ -18,3 +34,232 @@ async def test_send_simple_email_api_error(mock_httpx_client):
 
     with pytest.raises(APIResponseError):
         await send_simple_email("test@test.com", "Test Subject", "Test Body")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "status_code, error", [(400, APIClientError), (429, APIResponseError)]
+)
+async def test_send_simple_email_client_error(
+    mock_httpx_client, status_code: int, error: type
+):
+    mock_httpx_client.post.return_value = mailgun_response(status_code)
+
+    with pytest.raises(error):
+        await send_simple_email("test@test.com", "Test Subject", "Test Body")
+
+
+@pytest.mark.anyio
+async def test_send_simple_email_reuses_client(mock_httpx_client):
+    await send_simple_email("test@test.com", "Test Subject", "Test Body")
+    await send_simple_email("test@test.com", "Test Subject", "Test Body")
+
+    assert tasks.http_client is mock_httpx_client
+    assert mock_httpx_client.post.call_count == 2
+
+
+@pytest.fixture()
+async def mail_queue():
+    queue = MailQueue(maxsize=10, workers=2, max_retries=2, retry_backoff=0)
+    await queue.start()
+    yield queue
+    await queue.stop(timeout=1)
+
+
+@pytest.mark.anyio
+async def test_mail_queue_sends_on_stop(mail_queue: MailQueue):
+    send = AsyncMock()
+
+    for i in range(5):
+        await mail_queue.enqueue(send, f"user{i}@test.com")
+    await mail_queue.stop(timeout=1)
+
+    assert send.await_count == 5
+
+
+@pytest.mark.anyio
+async def test_mail_queue_retries(mail_queue: MailQueue):
+    send = AsyncMock(side_effect=[APIResponseError("500"), None])
+    send.__name__ = "send"
+
+    await mail_queue.enqueue(send, "test@test.com")
+    await mail_queue.stop(timeout=1)
+
+    assert send.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_mail_queue_gives_up(mail_queue: MailQueue):
+    send = AsyncMock(side_effect=APIResponseError("500"))
+    send.__name__ = "send"
+
+    await mail_queue.enqueue(send, "test@test.com")
+    await mail_queue.stop(timeout=1)
+
+    assert send.await_count == 3
+
+
+@pytest.mark.anyio
+async def test_mail_queue_does_not_retry_client_error(mail_queue: MailQueue):
+    send = AsyncMock(side_effect=APIClientError("400"))
+    send.__name__ = "send"
+
+    await mail_queue.enqueue(send, "test@test.com")
+    await mail_queue.stop(timeout=1)
+
+    assert send.await_count == 1
+
+
+@pytest.mark.anyio
+async def test_mail_queue_not_started():
+    with pytest.raises(RuntimeError):
+        await MailQueue(1, 1, 0, 0).enqueue(AsyncMock())
+
+
+@pytest.mark.anyio
+async def test_send_user_registration_emails(mock_httpx_client):
+    await tasks.send_user_registration_emails(
+        {"a@test.com": "http://a", "b@test.com": "http://b"}
+    )
+
+    data = mock_httpx_client.post.call_args.kwargs["data"]
+    assert data["to"] == ["a@test.com", "b@test.com"]
+    assert json.loads(data["recipient-variables"])["b@test.com"] == {
+        "email": "b@test.com",
+        "confirmation_url": "http://b",
+    }
+    assert "%recipient.confirmation_url%" in data["text"]
+
+
+@pytest.mark.anyio
+async def test_registration_batcher_flushes_on_max_size(mocker):
+    queue = mocker.Mock(enqueue=AsyncMock())
+    batcher = tasks.RegistrationEmailBatcher(queue, window=60, max_size=2)
+
+    await batcher.add("a@test.com", confirmation_url="http://a")
+    queue.enqueue.assert_not_called()
+    await batcher.add("b@test.com", confirmation_url="http://b")
+
+    queue.enqueue.assert_awaited_once_with(
+        tasks.send_user_registration_emails,
+        {"a@test.com": "http://a", "b@test.com": "http://b"},
+    )
+
+
+@pytest.mark.anyio
+async def test_registration_batcher_flushes_after_window(mocker):
+    queue = mocker.Mock(enqueue=AsyncMock())
+    batcher = tasks.RegistrationEmailBatcher(queue, window=0.01, max_size=100)
+
+    await batcher.add("a@test.com", confirmation_url="http://a")
+    await asyncio.sleep(0.05)
+
+    queue.enqueue.assert_awaited_once_with(
+        tasks.send_user_registration_emails, {"a@test.com": "http://a"}
+    )
+
+
+@pytest.mark.anyio
+async def test_registration_emails_sent_on_shutdown(
+    async_client: httpx.AsyncClient, mock_httpx_client
+):
+    await async_client.post(
+        "/register", json={"email": "test@test.com", "password": "1234"}
+    )
+    await async_client.post(
+        "/register", json={"email": "test2@test.com", "password": "1234"}
+    )
+    await tasks.shutdown()
+
+    mock_httpx_client.post.assert_called_once()
+    assert mock_httpx_client.post.call_args.kwargs["data"]["to"] == [
+        "test@test.com",
+        "test2@test.com",
+    ]
+
+
+def reject(bad: set[str], failing: set[str] = frozenset()):
+    """bad 주소가 섞인 요청은 400, failing 주소에는 500"""
+
+    async def post(*args, data: dict, **kwargs) -> httpx.Response:
+        if bad & set(data["to"]):
+            return mailgun_response(400)
+        if failing & set(data["to"]):
+            return mailgun_response(500)
+        return mailgun_response(200)
+
+    return post
+
+
+@pytest.mark.anyio
+async def test_send_user_registration_emails_rejected_batch(mock_httpx_client):
+    mock_httpx_client.post.side_effect = reject({"bad@test.com"})
+    confirmation_urls = {
+        "a@test.com": "http://a",
+        "bad@test.com": "http://bad",
+        "b@test.com": "http://b",
+    }
+
+    await tasks.send_user_registration_emails(confirmation_urls)
+
+    # 묶음 한 번 + 한 명씩 세 번, 거절된 주소 말고는 받음
+    sent = [call.kwargs["data"]["to"] for call in mock_httpx_client.post.call_args_list]
+    assert sent[0] == ["a@test.com", "bad@test.com", "b@test.com"]
+    assert sorted(sent[1:]) == [["a@test.com"], ["b@test.com"], ["bad@test.com"]]
+    assert confirmation_urls == {}
+
+
+@pytest.mark.anyio
+async def test_send_user_registration_emails_unauthorized_batch(mock_httpx_client):
+    mock_httpx_client.post.return_value = mailgun_response(401)
+    confirmation_urls = {"a@test.com": "http://a", "b@test.com": "http://b"}
+
+    with pytest.raises(APIClientError):
+        await tasks.send_user_registration_emails(confirmation_urls)
+
+    # 400이 아니면 한 명씩 다시 보내지 않음
+    mock_httpx_client.post.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_send_user_registration_emails_limits_fallback_concurrency(
+    mock_httpx_client, mocker
+):
+    mocker.patch.object(tasks.config, "MAIL_WORKERS", 2)
+    in_flight = peak = 0
+
+    async def post(*args, data: dict, **kwargs) -> httpx.Response:
+        nonlocal in_flight, peak
+        if len(data["to"]) > 1:
+            return mailgun_response(400)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return mailgun_response(200)
+
+    mock_httpx_client.post.side_effect = post
+    confirmation_urls = {f"user{i}@test.com": f"http://{i}" for i in range(6)}
+
+    await tasks.send_user_registration_emails(confirmation_urls)
+
+    assert peak == 2
+    assert confirmation_urls == {}
+
+
+@pytest.mark.anyio
+async def test_send_user_registration_emails_retries_only_failed(
+    mock_httpx_client,
+):
+    mock_httpx_client.post.side_effect = reject({"bad@test.com"}, {"b@test.com"})
+    confirmation_urls = {
+        "a@test.com": "http://a",
+        "bad@test.com": "http://bad",
+        "b@test.com": "http://b",
+    }
+
+    with pytest.raises(APIResponseError):
+        await tasks.send_user_registration_emails(confirmation_urls)
+
+    # MailQueue가 재시도할 때는 못 보낸 주소에만
+    assert confirmation_urls == {"b@test.com": "http://b"}